@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the evaluator, on perturbed copies of ground_truth.json.
+
+    python bench_evaluator.py throughput [n_docs]
+    python bench_evaluator.py semantic [n_docs]
+    python bench_evaluator.py judge [n_docs] [latency_s]
+    python bench_evaluator.py align [n_rows ...]
+    python bench_evaluator.py corpus [n_docs] [workers]
+"""
+
+import copy
+import difflib
+import json
+import random
+import sys
+import time
+
+from evaluator import (FakeEmbedder, FakeJudge, JudgeScheduler, SemanticScorer, aggregate, align, compare,
+                       evaluate, evaluate_corpus, flatten, read_manifest)
+
+
+def perturb(truth, seed):
+    """A plausible extraction of truth: reworded, rounded, dropped and invented fields."""
+    rng = random.Random(seed)
+    doc = copy.deepcopy(truth)
+
+    def visit(node):
+        if isinstance(node, dict):
+            for key in list(node):
+                value = node[key]
+                if rng.random() < 0.03:
+                    del node[key]
+                elif isinstance(value, (dict, list)):
+                    visit(value)
+                elif isinstance(value, bool):
+                    node[key] = value if rng.random() < 0.95 else not value
+                elif isinstance(value, (int, float)):
+                    node[key] = value if rng.random() < 0.8 else type(value)(value * rng.uniform(0.9, 1.1))
+                elif isinstance(value, str) and rng.random() < 0.5:
+                    words = value.split()
+                    head = words[: len(words) // 3]
+                    rng.shuffle(head)
+                    words[: len(head)] = head
+                    node[key] = " ".join(words).upper() if rng.random() < 0.1 else " ".join(words)
+            if rng.random() < 0.02:
+                node[f"extra_{rng.randint(0, 9)}"] = True
+        elif isinstance(node, list):
+            if node and rng.random() < 0.2:
+                node.pop(rng.randrange(len(node)))
+            for item in node:
+                visit(item)
+
+    visit(doc)
+    return doc
+
+
+# ------------------------------------------------------------------
+# Throughput: batched evaluate() vs scoring one field at a time
+# ------------------------------------------------------------------
+def _evaluate_field_by_field(truth, prediction):
+    # The ad-hoc scoring evaluate() replaces: one SequenceMatcher per field.
+    truth_fields, pred_fields = flatten(truth), flatten(prediction)
+    scores = {}
+    for path, value in truth_fields.items():
+        if path in pred_fields:
+            a, b = str(value).lower(), str(pred_fields[path]).lower()
+            scores[path] = (a == b, difflib.SequenceMatcher(None, a, b).ratio())
+    return scores
+
+
+def bench_throughput(n_docs=2000):
+    n_docs = int(n_docs)
+    with open("ground_truth.json") as f:
+        truth = json.load(f)
+    predictions = [perturb(truth, seed) for seed in range(n_docs)]
+    print(f"{n_docs} documents, {len(flatten(truth))} ground-truth fields each")
+    for label, fn in (("field by field", _evaluate_field_by_field), ("evaluate()", evaluate)):
+        t0 = time.perf_counter()
+        for prediction in predictions:
+            fn(truth, prediction)
+        secs = time.perf_counter() - t0
+        print(f"{label:<16} {secs:6.2f}s  {secs / n_docs * 1000:6.2f} ms/doc  {n_docs / secs * 60:9.0f} docs/min")
+
+
+# ------------------------------------------------------------------
+# Semantic scoring: one embedding call per field vs the deduped cache
+# ------------------------------------------------------------------
+class _CountingEmbedder(FakeEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.texts = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return super().embed(texts)
+
+
+class _PerFieldScorer:
+    # What scoring each field pair on its own costs: two texts per call, no reuse.
+    def __init__(self, embedder):
+        self.embedder = embedder
+
+    def similarity(self, truths, preds):
+        return [float(self.embedder.embed([t, p]).prod(axis=0).sum()) for t, p in zip(truths, preds)]
+
+
+def bench_semantic(n_docs=1000):
+    import tempfile
+    n_docs = int(n_docs)
+    with open("ground_truth.json") as f:
+        truth = json.load(f)
+    predictions = [perturb(truth, seed) for seed in range(n_docs)]
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [
+            ("per field", lambda e: _PerFieldScorer(e)),
+            ("deduped, cold", lambda e: SemanticScorer(e, tmp)),
+            ("deduped, warm", lambda e: SemanticScorer(e, tmp)),
+        ]
+        print(f"{n_docs} documents, fake embedder")
+        for label, make in runs:
+            embedder = _CountingEmbedder()
+            scorer = make(embedder)
+            t0 = time.perf_counter()
+            for prediction in predictions:
+                evaluate(truth, prediction, scorer)
+            secs = time.perf_counter() - t0
+            print(f"{label:<14} {secs:6.2f}s  {embedder.calls:7d} embed calls  {embedder.texts:7d} texts embedded")
+
+
+# ------------------------------------------------------------------
+# LLM judge: every inexact field alone vs band + batching + cache
+# ------------------------------------------------------------------
+class _NoVerdicts:
+    def get_many(self, keys):
+        return {}
+
+    def put_many(self, scores):
+        pass
+
+
+def bench_judge(n_docs=10, latency=0.05):
+    n_docs, latency = int(n_docs), float(latency)
+    with open("ground_truth.json") as f:
+        truth = json.load(f)
+    # Repeats, as when re-scoring a corpus after an extractor change.
+    predictions = [perturb(truth, seed % max(n_docs // 2, 1)) for seed in range(n_docs)]
+    semantic = SemanticScorer(FakeEmbedder(), cache_dir=None)
+    runs = [
+        ("per field", dict(band=(0.0, float("inf")), batch_size=1, concurrency=1), _NoVerdicts()),
+        ("band+batch+cache", dict(band=(0.5, 0.9), batch_size=20, concurrency=4), None),
+    ]
+    print(f"{n_docs} documents, fake judge at {latency * 1000:.0f} ms/call, no rate limit")
+    for label, options, cache in runs:
+        judge = JudgeScheduler(FakeJudge(latency), cache_path=None, requests_per_minute=None, **options)
+        judge.cache = cache or judge.cache
+        t0 = time.perf_counter()
+        for prediction in predictions:
+            evaluate(truth, prediction, semantic, judge)
+        stats = judge.stats()
+        print(f"{label:<18} {time.perf_counter() - t0:6.2f}s  {stats['judge_calls']:5d} calls  "
+              f"{stats['fields_judged']:5d} judged  {stats['cache_hits']:5d} cache hits")
+
+
+# ------------------------------------------------------------------
+# List alignment: one inserted row in a long claims history
+# ------------------------------------------------------------------
+def _claims(n, seed=0):
+    rng = random.Random(seed)
+    return [{"year": rng.randint(2015, 2025), "claim_type": rng.choice(["Employers Liability", "Public Liability",
+                                                                         "Products Liability"]),
+             "description": f"{rng.choice(['Slip', 'Cut', 'Burn', 'Strain'])} injury at site {rng.randint(1, 40)}, "
+                            f"ref {rng.randint(10000, 99999)}",
+             "claim_amount": rng.randint(1, 500) * 100, "status": rng.choice(["Open", "Closed", "Settled"])}
+            for _ in range(n)]
+
+
+# Identical documents must score perfectly whatever their rows look like;
+# rows with no scalar keys of their own once all went unmatched.
+_ROW_SHAPES = {
+    "list of lists": {"t": [["x", "1"], ["y", "2"]]},
+    "nested records": {"locs": [{"addr": {"street": "1 High St", "city": "Derby"}},
+                                {"addr": {"street": "5 Mill Rd", "city": "Leeds"}}]},
+    "rows of lists": {"r": [{"tags": ["a", "b"]}, {"tags": ["c"]}]},
+}
+
+
+def bench_align(*sizes):
+    sizes = [int(n) for n in sizes] or [50, 200, 500]
+    for shape, doc in _ROW_SHAPES.items():
+        result = evaluate(doc, copy.deepcopy(doc))
+        rate = result["overall_metrics"]["exact_match_rate"]
+        assert rate == 1.0 and not result["missing_fields"] and not result["hallucinated_fields"], (shape, result)
+        print(f"identical {shape}: exact {rate:.3f}")
+    print(f"{'rows':>6}{'index exact':>13}{'aligned exact':>15}{'align s':>9}{'evaluate s':>12}")
+    for n in sizes:
+        truth = {"liability_covers": {"claims_history": _claims(n)}}
+        rows = copy.deepcopy(truth["liability_covers"]["claims_history"])
+        rows.insert(0, _claims(1, seed=n + 1)[0])
+        random.Random(n).shuffle(rows)
+        prediction = {"liability_covers": {"claims_history": rows}}
+        by_index = evaluate(truth, prediction, align_lists=False)["overall_metrics"]["exact_match_rate"]
+        t0 = time.perf_counter()
+        align(truth, prediction)
+        t_align = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        aligned = evaluate(truth, prediction)["overall_metrics"]["exact_match_rate"]
+        print(f"{n:>6}{by_index:>13.3f}{aligned:>15.3f}{t_align:>9.3f}{time.perf_counter() - t0:>12.3f}")
+
+
+# ------------------------------------------------------------------
+# Corpus runner: serial vs a process pool, and a paired version comparison
+# ------------------------------------------------------------------
+def _write_corpus(root, truth, n_docs, seed_offset=0):
+    # One ground truth per document, as in a real corpus, each with its perturbed extraction.
+    manifest = root / f"manifest_{seed_offset}.jsonl"
+    with open(manifest, "w") as m:
+        for i in range(n_docs):
+            for kind, doc in (("truth", truth), ("pred", perturb(truth, i + seed_offset))):
+                with open(root / f"{kind}_{i}_{seed_offset}.json", "w") as f:
+                    json.dump(doc, f)
+            m.write(json.dumps({"id": f"doc{i}", "ground_truth": f"truth_{i}_{seed_offset}.json",
+                                "prediction": f"pred_{i}_{seed_offset}.json"}) + "\n")
+    return read_manifest(manifest)
+
+
+def bench_corpus(n_docs=2000, workers=0):
+    import os
+    import tempfile
+    from pathlib import Path
+    n_docs, workers = int(n_docs), int(workers) or os.cpu_count()
+    with open("ground_truth.json") as f:
+        truth = json.load(f)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        entries = _write_corpus(root, truth, n_docs)
+        print(f"{n_docs} documents")
+        for label, n in (("serial", 1), (f"{workers} workers", workers)):
+            t0 = time.perf_counter()
+            records = evaluate_corpus(entries, root / f"results_{n}.jsonl", workers=n)
+            secs = time.perf_counter() - t0
+            print(f"{label:<12} {secs:6.2f}s  {n_docs / secs * 60:9.0f} docs/min")
+        t0 = time.perf_counter()
+        summary = aggregate(records)
+        print(f"aggregate    {time.perf_counter() - t0:6.2f}s  {len(summary['category_scores'])} categories")
+        for name in ("exact_match_rate", "fuzzy_match_rate", "field_coverage"):
+            s = summary["overall_metrics"][name]
+            print(f"  {name:<18} {s['mean']:.4f} [{s['ci_low']:.4f}, {s['ci_high']:.4f}]")
+        # A second "extractor version": a different draw of the same perturbations.
+        other = evaluate_corpus(_write_corpus(root, truth, n_docs, seed_offset=n_docs), root / "other.jsonl",
+                                workers=workers)
+        d = compare(records, other)["overall_metrics"]["exact_match_rate"]
+        print(f"  paired exact_match_rate delta {d['delta']:+.4f} [{d['ci_low']:+.4f}, {d['ci_high']:+.4f}]")
+
+
+BENCHES = {
+    "throughput": bench_throughput,
+    "semantic": bench_semantic,
+    "judge": bench_judge,
+    "align": bench_align,
+    "corpus": bench_corpus,
+}
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "throughput"
+    BENCHES[name](*sys.argv[2:])
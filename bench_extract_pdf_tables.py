@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Timing comparisons and the benchmark suite for extract_pdf_tables.
+
+    python bench_extract_pdf_tables.py bordered [pdf]
+    python bench_extract_pdf_tables.py group_rows
+    python bench_extract_pdf_tables.py borderless [n_cols ...]
+    python bench_extract_pdf_tables.py document [pdf]
+    python bench_extract_pdf_tables.py suite [--save-baseline] [--baseline F] [--threshold 0.2]
+
+`suite` runs extract_pdf on synthetic bordered / borderless PDFs of
+controlled size and on the sample PDFs in the repo, reporting pages/sec,
+peak RSS and per-stage times. A case that raises is reported with its
+error and left out of the throughput figures. It exits non-zero when any
+case is slower than the saved baseline by more than the threshold, or
+fails differently from it (newly, no longer, or with another exception).
+"""
+
+import json
+import multiprocessing
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pdfplumber
+
+from extract_pdf_tables import (
+    LINES_TABLE_SETTINGS,
+    TEXT_TABLE_SETTINGS,
+    PageAnalysis,
+    StageTimings,
+    extract_bordered_table,
+    extract_borderless_from_bbox,
+    extract_pdf,
+    group_rows,
+)
+
+
+# ------------------------------------------------------------------
+# Bordered cell text: per-cell crop vs single pass
+# ------------------------------------------------------------------
+def bench_bordered(pdf_path="commercial_property_details.pdf", repeat=3):
+    pdf_path = Path(pdf_path)
+    print(f"{pdf_path.name}: extract_bordered_table per-cell crop vs single pass")
+    total = {False: 0.0, True: 0.0}
+
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_no, page in enumerate(pdf.pages, start=1):
+            tables = page.find_tables(table_settings=LINES_TABLE_SETTINGS)
+            if not tables:
+                continue
+
+            grids = {}
+            best = {}
+            for single_pass in (False, True):
+                times = []
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    grids[single_pass] = extract_bordered_table(page, tables[0], single_pass=single_pass)
+                    times.append(time.perf_counter() - t0)
+                best[single_pass] = min(times)
+                total[single_pass] += best[single_pass]
+
+            same = "same" if grids[False] == grids[True] else "DIFFERENT"
+            print(f"  page {page_no:>3}  cells={len(tables[0].cells):>4}  "
+                  f"crop={best[False] * 1000:8.1f}ms  single={best[True] * 1000:8.1f}ms  {same}")
+
+    speedup = total[False] / total[True] if total[True] else float("nan")
+    print(f"  total     crop={total[False] * 1000:8.1f}ms  single={total[True] * 1000:8.1f}ms  x{speedup:.1f}")
+
+
+# ------------------------------------------------------------------
+# group_rows: sorted sweep vs the original all-rows scan
+# ------------------------------------------------------------------
+def _group_rows_all_rows(words, y_tol=3):
+    # Original O(words x rows) implementation, kept as the reference.
+    rows = []
+    for w in sorted(words, key=lambda d: d['top']):
+        for r in rows:
+            if abs(w['top'] - r['top']) <= y_tol:
+                r['words'].append(w)
+                break
+        else:
+            rows.append({'top': w['top'], 'words': [w]})
+    for r in rows:
+        r['words'] = sorted(r['words'], key=lambda d: d['x0'])
+    return rows
+
+
+def synthetic_words(n_words, words_per_row=8, line_height=12.0, jitter=1.5, seed=0):
+    """Shuffled words laid out like a dense signing list, with baseline jitter."""
+    rng = random.Random(seed)
+    words = []
+    for i in range(n_words):
+        row, col = divmod(i, words_per_row)
+        top = row * line_height + rng.uniform(0, jitter)
+        x0 = 40 + col * 60 + rng.uniform(0, 3)
+        words.append({"text": f"w{i}", "top": top, "bottom": top + 9, "x0": x0, "x1": x0 + 30})
+    rng.shuffle(words)
+    return words
+
+
+def bench_group_rows(sizes=(1_000, 5_000, 10_000, 20_000, 50_000, 100_000), reference_max=20_000):
+    print("group_rows: sorted sweep vs all-rows scan (reference skipped above "
+          f"{reference_max:,} words)")
+    for n in sizes:
+        words = synthetic_words(n)
+
+        t0 = time.perf_counter()
+        rows = group_rows(words, y_tol=3)
+        sweep = time.perf_counter() - t0
+
+        line = f"  {n:>7,} words  rows={len(rows):>6,}  sweep={sweep * 1000:8.1f}ms"
+        if n <= reference_max:
+            t0 = time.perf_counter()
+            ref = _group_rows_all_rows(words, y_tol=3)
+            scan = time.perf_counter() - t0
+            same = "same" if ref == rows else "DIFFERENT"
+            line += f"  scan={scan * 1000:9.1f}ms  x{scan / sweep:.0f}  {same}"
+        print(line)
+
+
+# ------------------------------------------------------------------
+# Borderless column assignment: NumPy path vs per-word loops
+# ------------------------------------------------------------------
+def _amount_words(rng, k):
+    return " ".join(f"{rng.randint(0, 999_999):,}" for _ in range(k))
+
+
+def make_borderless_pdf(path, n_rows=40, n_cols=12, n_pages=1, words_per_cell=1, seed=0):
+    """Write a borderless schedule: title, header row, date + amount columns."""
+    from reportlab.pdfgen import canvas
+
+    rng = random.Random(seed)
+    col_w = 30 + 32 * words_per_cell
+    width, height = 60 + col_w * n_cols, 140 + 14 * n_rows
+    c = canvas.Canvas(str(path), pagesize=(width, height))
+    for _ in range(n_pages):
+        y = height - 70
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(30, y, "Schedule of Values")
+        y -= 22
+        c.setFont("Helvetica", 8)
+        for j in range(n_cols):
+            c.drawString(30 + j * col_w, y, "Date" if j == 0 else f"Item {j}")
+        for _ in range(n_rows):
+            y -= 14
+            c.drawString(30, y, f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024")
+            for j in range(1, n_cols):
+                c.drawString(30 + j * col_w, y, _amount_words(rng, words_per_cell))
+        c.showPage()
+    c.save()
+
+
+def make_bordered_pdf(path, n_rows=30, n_cols=6, n_pages=1, words_per_cell=1, seed=0):
+    """
+    Write a ruled grid spanning n_pages: the header row is on page 1 only,
+    so later pages exercise headerless stitching.
+    """
+    from reportlab.pdfgen import canvas
+
+    rng = random.Random(seed)
+    col_w, row_h = 30 + 32 * words_per_cell, 16
+    width, height = 60 + col_w * n_cols, 120 + row_h * (n_rows + 1)
+    c = canvas.Canvas(str(path), pagesize=(width, height))
+    for page in range(n_pages):
+        rows = ([[f"Heading {j + 1}" for j in range(n_cols)]] if page == 0 else []) + [
+            [_amount_words(rng, words_per_cell) for _ in range(n_cols)] for _ in range(n_rows)
+        ]
+        top = height - 60
+        bottom = top - row_h * len(rows)
+        for i in range(len(rows) + 1):
+            c.line(30, top - i * row_h, 30 + col_w * n_cols, top - i * row_h)
+        for j in range(n_cols + 1):
+            c.line(30 + j * col_w, top, 30 + j * col_w, bottom)
+        c.setFont("Helvetica", 8)
+        for i, row in enumerate(rows):
+            for j, text in enumerate(row):
+                c.drawString(34 + j * col_w, top - (i + 1) * row_h + 5, text)
+        c.showPage()
+    c.save()
+
+
+def bench_borderless(*n_cols_list, n_rows=60, repeat=3):
+    n_cols_list = [int(n) for n in n_cols_list] or [4, 8, 16, 32]
+    print(f"extract_borderless_from_bbox: per-word loops vs NumPy ({n_rows} rows)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_cols in n_cols_list:
+            pdf_path = Path(tmp) / f"borderless_{n_cols}.pdf"
+            make_borderless_pdf(pdf_path, n_rows=n_rows, n_cols=n_cols)
+            with pdfplumber.open(pdf_path) as pdf:
+                page = pdf.pages[0]
+                bbox = page.find_tables(table_settings=TEXT_TABLE_SETTINGS)[0].bbox
+                # Share the word cache so only the table logic is timed.
+                analysis = PageAnalysis(page)
+                extract_borderless_from_bbox(page, bbox, analysis=analysis)
+
+                results, best = {}, {}
+                for vectorized in (False, True):
+                    times = []
+                    for _ in range(repeat):
+                        t0 = time.perf_counter()
+                        results[vectorized] = extract_borderless_from_bbox(
+                            page, bbox, analysis=analysis, vectorized=vectorized)
+                        times.append(time.perf_counter() - t0)
+                    best[vectorized] = min(times)
+
+            (df_a, meta_a), (df_b, meta_b) = results[False], results[True]
+            same = "same" if df_a.equals(df_b) and meta_a == meta_b else "DIFFERENT"
+            print(f"  {n_cols:>3} cols  table={df_b.shape[0]}x{df_b.shape[1]}  "
+                  f"loops={best[False] * 1000:7.1f}ms  numpy={best[True] * 1000:7.1f}ms  "
+                  f"x{best[False] / best[True]:.1f}  {same}")
+
+
+# ------------------------------------------------------------------
+# Document file: one row per (table_idx, row_idx), ordinals as in file names
+# ------------------------------------------------------------------
+def bench_document(pdf_path="ABC_Manufacturing_Insurance_Submission.pdf"):
+    import pyarrow.parquet as pq
+
+    pdf_path = Path(pdf_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        t0 = time.perf_counter()
+        extract_pdf(pdf_path, out_dir, document_fmt="parquet")
+        elapsed = time.perf_counter() - t0
+        table = pq.read_table(out_dir / f"{pdf_path.stem}_tables.parquet")
+        names = sorted(p.stem for p in out_dir.glob("*.csv"))
+
+    rows = table.select(["table_idx", "row_idx", "page_no"]).to_pylist()
+    keys = [(r["table_idx"], r["row_idx"]) for r in rows]
+    assert len(set(keys)) == len(keys), f"duplicate (table_idx, row_idx) in {pdf_path.name}"
+    pages = [r["page_no"] for r in rows]
+    assert pages == sorted(pages), f"rows out of page order in {pdf_path.name}"
+    ordinals = sorted(int(name[len(pdf_path.stem) + 1:].split("_")[0]) for name in names)
+    assert ordinals == list(range(1, len(names) + 1)), f"file ordinals not 1..n: {names}"
+    assert set(table.column("table_idx").to_pylist()) <= set(ordinals)
+    print(f"{pdf_path.name}: {len(names)} tables, {len(rows)} rows, (table_idx, row_idx) unique, "
+          f"page order kept, {elapsed * 1000:.0f}ms")
+
+
+# ------------------------------------------------------------------
+# Suite: extract_pdf throughput, peak RSS, stages; baseline gate
+# ------------------------------------------------------------------
+SYNTHETIC_CASES = {
+    "bordered_small": (make_bordered_pdf, dict(n_pages=2, n_rows=20, n_cols=4)),
+    "bordered_long": (make_bordered_pdf, dict(n_pages=20, n_rows=40, n_cols=8)),
+    "bordered_wordy": (make_bordered_pdf, dict(n_pages=5, n_rows=30, n_cols=6, words_per_cell=4)),
+    "borderless_small": (make_borderless_pdf, dict(n_pages=2, n_rows=20, n_cols=4)),
+    "borderless_long": (make_borderless_pdf, dict(n_pages=20, n_rows=50, n_cols=10)),
+    "borderless_wide": (make_borderless_pdf, dict(n_pages=3, n_rows=40, n_cols=30)),
+}
+
+SAMPLE_PDFS = [
+    "ABC_Manufacturing_Insurance_Submission.pdf",
+    "commercial_property_details.pdf",
+    "submission_generation/output/doc_260124_0/Broking_Submission_Apex_Precision.pdf",
+    "submission_generation/output/doc_260124_1/Submission_Formatted.pdf",
+    "submission_generation/output/doc_260126/property-owners-insurance-application_FILLED.pdf",
+]
+
+
+def _run_case(pdf_path, repeat):
+    # Runs in a fresh process so ru_maxrss is this case's peak alone.
+    with pdfplumber.open(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+    best, best_timings, error = None, None, None
+    for _ in range(repeat):
+        out_dir = Path(tempfile.mkdtemp())
+        timings = StageTimings()
+        t0 = time.perf_counter()
+        try:
+            extract_pdf(Path(pdf_path), out_dir, timings=timings)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - t0
+        shutil.rmtree(out_dir, ignore_errors=True)
+        if error:
+            # A partial run has no meaningful throughput; report the failure only.
+            best, best_timings = elapsed, timings
+            break
+        if best is None or elapsed < best:
+            best, best_timings = elapsed, timings
+    return {
+        "pages": n_pages,
+        "seconds": best,
+        "pages_per_sec": None if error else n_pages / best,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "stages": {k: round(v, 6) for k, v in sorted(best_timings.seconds.items())},
+        "error": error,
+    }
+
+
+def run_suite(repeat=3, cases=None):
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        pdfs = {}
+        for name, (make, params) in SYNTHETIC_CASES.items():
+            pdfs[name] = Path(tmp) / f"{name}.pdf"
+            make(pdfs[name], **params)
+        for rel in SAMPLE_PDFS:
+            if Path(rel).exists():
+                pdfs[f"sample:{Path(rel).stem}"] = Path(rel)
+
+        for name, pdf_path in pdfs.items():
+            if cases and name not in cases:
+                continue
+            with ctx.Pool(1) as pool:
+                results[name] = pool.apply(_run_case, (str(pdf_path), repeat))
+    return results
+
+
+def _pps(r):
+    return r["pages_per_sec"] if r and not r.get("error") else None
+
+
+def _error_type(r):
+    return r["error"].split(":", 1)[0] if r.get("error") else None
+
+
+def print_suite(results, baseline=None):
+    print(f"{'case':<52}{'pages':>6}{'pages/s':>10}{'base':>10}{'delta':>8}{'rss MB':>9}  top stages")
+    for name, r in results.items():
+        pps, base_pps = _pps(r), _pps((baseline or {}).get(name))
+        pps_col = f"{pps:10.1f}" if pps else f"{'-':>10}"
+        base_col = f"{base_pps:10.1f}" if base_pps else f"{'-':>10}"
+        delta = f"{pps / base_pps - 1:+8.0%}" if pps and base_pps else f"{'-':>8}"
+        top = sorted(r["stages"].items(), key=lambda kv: kv[1], reverse=True)[:3]
+        stages = ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in top)
+        flag = f"  ({r['error']})" if r["error"] else ""
+        print(f"{name:<52}{r['pages']:>6}{pps_col}{base_col}{delta}"
+              f"{r['peak_rss_mb']:9.0f}  {stages}{flag}")
+
+
+def regressions(results, baseline, threshold):
+    """
+    Cases whose throughput fell more than `threshold` below the baseline, or
+    whose error status differs from it (newly failing, fixed, or failing
+    with another exception type), as "name: reason" strings.
+    """
+    found = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        was, now = _error_type(base), _error_type(r)
+        if was != now:
+            found.append(f"{name}: {was or 'ok'} -> {now or 'ok'}")
+        elif now is None and r["pages_per_sec"] < base["pages_per_sec"] * (1 - threshold):
+            found.append(f"{name}: {r['pages_per_sec'] / base['pages_per_sec'] - 1:+.0%} pages/s")
+    return found
+
+
+def bench_suite(*argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="bench_extract_pdf_tables.py suite")
+    parser.add_argument("--baseline", type=Path, default=Path("bench_baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed pages/sec drop vs baseline (default 0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--case", action="append", help="run only these cases")
+    args = parser.parse_args(argv)
+
+    results = run_suite(repeat=args.repeat, cases=args.case)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    print_suite(results, baseline)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=1))
+        print(f"Baseline saved to {args.baseline}")
+    elif baseline:
+        found = regressions(results, baseline, args.threshold)
+        if found:
+            print(f"REGRESSION (> {args.threshold:.0%} slower than baseline, or error status changed):")
+            for line in found:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No case more than {args.threshold:.0%} slower than baseline; error status unchanged.")
+
+
+BENCHES = {
+    "bordered": bench_bordered,
+    "group_rows": bench_group_rows,
+    "borderless": bench_borderless,
+    "document": bench_document,
+    "suite": bench_suite,
+}
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "bordered"
+    BENCHES[name](*sys.argv[2:])
@@ -0,0 +1,22 @@
+"""
+Extraction evaluator: scores an extracted submission JSON against its ground
+truth and produces evaluation_results.json.
+
+    python -m evaluator ground_truth.json extracted_result.json -o evaluation_results.json
+    python -m evaluator corpus manifest.jsonl -o corpus_results.jsonl --summary corpus_summary.json
+"""
+
+from .align import align, linear_sum_assignment, row_similarity
+from .corpus import aggregate, bootstrap_ci, compare, evaluate_corpus, load_records, read_manifest
+from .embeddings import EmbeddingCache, FakeEmbedder, LocalEmbedder, SemanticScorer, make_embedder
+from .flatten import category, field_type, flatten
+from .judge import FakeJudge, JudgeScheduler, OpenAIJudge, make_judge
+from .report import evaluate, evaluate_files
+from .scoring import fuzzy_ratio, score_records
+
+__all__ = [
+    "EmbeddingCache", "FakeEmbedder", "FakeJudge", "JudgeScheduler", "LocalEmbedder", "OpenAIJudge",
+    "SemanticScorer", "aggregate", "align", "bootstrap_ci", "category", "compare", "evaluate",
+    "evaluate_corpus", "evaluate_files", "field_type", "flatten", "fuzzy_ratio", "linear_sum_assignment",
+    "load_records", "make_embedder", "make_judge", "read_manifest", "row_similarity", "score_records",
+]
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+
+from .corpus import aggregate, compare, evaluate_corpus, load_records, read_manifest
+from .embeddings import DEFAULT_EMBEDDING_CACHE_DIR, SemanticScorer, make_embedder
+from .judge import DEFAULT_VERDICT_CACHE_PATH, JUDGE_MODEL, JudgeScheduler, make_judge
+from .report import evaluate_files
+
+
+def add_scorer_arguments(parser):
+    parser.add_argument("--no-align", action="store_true",
+                        help="Compare list rows by index instead of matching them by content")
+    parser.add_argument("--semantic", choices=["none", "fake", "local"], default="none",
+                        help="Embedding backend for text fields' semantic_score (fake = offline, for testing)")
+    parser.add_argument("--embedding-model", default="all-MiniLM-L6-v2",
+                        help="sentence-transformers model name or local path, for --semantic local")
+    parser.add_argument("--embedding-cache", default=str(DEFAULT_EMBEDDING_CACHE_DIR))
+    parser.add_argument("--no-embedding-cache", action="store_true", help="Keep embeddings in memory only")
+    parser.add_argument("--judge", choices=["none", "fake", "openai"], default="none",
+                        help="LLM judge for fields in the ambiguous band (fake = offline, for testing)")
+    parser.add_argument("--judge-model", default=JUDGE_MODEL)
+    parser.add_argument("--judge-band", type=float, nargs=2, default=(0.5, 0.9), metavar=("LOW", "HIGH"),
+                        help="Judge fields whose best fuzzy/semantic score is in [LOW, HIGH)")
+    parser.add_argument("--judge-batch-size", type=int, default=20, help="Field comparisons per judge prompt")
+    parser.add_argument("--judge-concurrency", type=int, default=4)
+    parser.add_argument("--judge-rpm", type=float, default=60, help="Judge requests per minute")
+    parser.add_argument("--judge-timeout", type=float, default=120.0, help="Seconds per judge request")
+    parser.add_argument("--judge-retries", type=int, default=3,
+                        help="Retries per judge request on timeouts, rate limits and malformed replies")
+    parser.add_argument("--judge-cache", default=str(DEFAULT_VERDICT_CACHE_PATH))
+    parser.add_argument("--no-judge-cache", action="store_true", help="Keep verdicts in memory only")
+
+
+def make_scorers(args):
+    """(semantic, judge) as configured by add_scorer_arguments; either may be None."""
+    semantic = None
+    if args.semantic != "none":
+        options = {"model": args.embedding_model} if args.semantic == "local" else {}
+        semantic = SemanticScorer(make_embedder(args.semantic, **options),
+                                  None if args.no_embedding_cache else args.embedding_cache)
+
+    judge = None
+    if args.judge != "none":
+        options = {"model": args.judge_model} if args.judge == "openai" else {}
+        judge = JudgeScheduler(make_judge(args.judge, **options),
+                               None if args.no_judge_cache else args.judge_cache,
+                               band=tuple(args.judge_band), batch_size=args.judge_batch_size,
+                               concurrency=args.judge_concurrency, requests_per_minute=args.judge_rpm,
+                               timeout=args.judge_timeout, retries=args.judge_retries)
+    return semantic, judge
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["corpus"]:
+        return corpus_main(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="python -m evaluator",
+                                     description="Score an extraction against its ground truth. "
+                                                 "`python -m evaluator corpus -h` scores a whole manifest.")
+    parser.add_argument("ground_truth", help="Ground-truth JSON, e.g. ground_truth.json")
+    parser.add_argument("prediction", help="Extracted JSON, e.g. extracted_result.json")
+    parser.add_argument("-o", "--out", default="evaluation_results.json")
+    add_scorer_arguments(parser)
+    args = parser.parse_args(argv)
+
+    semantic, judge = make_scorers(args)
+    results = evaluate_files(args.ground_truth, args.prediction, args.out, semantic, judge,
+                             align_lists=not args.no_align)
+    print(json.dumps(results["overall_metrics"], indent=2))
+    print(f"{len(results['missing_fields'])} missing, {len(results['hallucinated_fields'])} hallucinated; "
+          f"written to {args.out}")
+    if semantic is not None:
+        print(f"embeddings: {semantic.stats()}")
+    if judge is not None:
+        judge.close()
+        print(f"judge: {judge.stats()}")
+
+
+def corpus_main(argv):
+    parser = argparse.ArgumentParser(prog="python -m evaluator corpus",
+                                     description="Score every (ground truth, prediction) pair in a manifest "
+                                                 "and summarise the corpus with confidence intervals.")
+    parser.add_argument("manifest", help="JSONL or CSV with ground_truth, prediction and optional id per document")
+    parser.add_argument("-o", "--out", default="corpus_results.jsonl", help="Per-document results, one JSON per line")
+    parser.add_argument("--summary", default="corpus_summary.json")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker processes (default 0 = one per CPU, 1 = serial)")
+    parser.add_argument("--chunk-size", type=int, default=8, help="Documents handed to a worker at a time")
+    parser.add_argument("--resume", action="store_true",
+                        help="Keep documents already scored in --out and evaluate only the rest")
+    parser.add_argument("--field-evaluations", action="store_true",
+                        help="Keep field_evaluations in the per-document records")
+    parser.add_argument("--baseline", help="Per-document results of an earlier run to compare against, paired by id")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--bootstrap", type=int, default=1000, help="Bootstrap resamples per interval")
+    add_scorer_arguments(parser)
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count()
+    # Each worker rate-limits its own judge calls; split the budget between them.
+    args.judge_rpm /= workers
+    entries = read_manifest(args.manifest)
+    t0 = time.perf_counter()
+    records = evaluate_corpus(entries, args.out, partial(make_scorers, args), workers, args.chunk_size,
+                              align_lists=not args.no_align, keep_fields=args.field_evaluations,
+                              resume=args.resume)
+    secs = time.perf_counter() - t0
+
+    summary = aggregate(records, args.confidence, args.bootstrap)
+    if args.baseline:
+        summary["versus_baseline"] = compare(load_records(args.baseline), records, args.confidence, args.bootstrap)
+    with open(args.summary, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    rate = "" if args.resume else f" ({len(entries) / max(secs, 1e-9) * 60:.0f} docs/min, {workers} workers)"
+    print(f"{summary['documents']} documents scored, {len(summary['failed'])} failed, in {secs:.1f}s{rate}")
+    pct = round(args.confidence * 100)
+    for name, stat in summary["overall_metrics"].items() if summary["documents"] else ():
+        line = f"  {name:<20} {stat['mean']:.4f}  {pct}% CI [{stat['ci_low']:.4f}, {stat['ci_high']:.4f}]"
+        if args.baseline and summary["versus_baseline"]["documents"]:
+            d = summary["versus_baseline"]["overall_metrics"][name]
+            line += f"  vs baseline {d['delta']:+.4f} [{d['ci_low']:+.4f}, {d['ci_high']:+.4f}]"
+        print(line)
+    print(f"per-document results in {args.out}, summary in {args.summary}")
+
+
+if __name__ == "__main__":
+    main()
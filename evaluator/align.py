@@ -0,0 +1,183 @@
+import numpy as np
+
+from .embeddings import hash_vectors
+from .flatten import flatten
+from .scoring import to_bool, to_number
+
+# ------------------------------------------------------------------
+# Optimal assignment
+# ------------------------------------------------------------------
+
+
+def linear_sum_assignment(cost):
+    """
+    (row_ind, col_ind) minimising cost[row_ind, col_ind].sum(), as
+    scipy.optimize.linear_sum_assignment does, for a rectangular matrix.
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    best = cost.argmin(axis=1)
+    if len(np.unique(best)) == n:
+        # Every row's cheapest column is distinct, so taking them is optimal;
+        # the usual case for lists that are mostly in order.
+        rows, cols = np.arange(n), best
+    else:
+        rows, cols = _hungarian(cost)
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def _hungarian(cost):
+    """
+    Shortest-augmenting-path Hungarian algorithm with dual potentials for
+    n <= m, O(n^2 m); each augmenting step updates every column at once.
+    """
+    n, m = cost.shape
+    # 1-based with column 0 as the virtual start column, as in the textbook form.
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.intp)  # owner[j]: row assigned to column j, 0 = free
+    way = np.zeros(m + 1, dtype=np.intp)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            free = ~used
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv, np.inf)
+            candidates[0] = np.inf
+            j1 = int(np.argmin(candidates))
+            delta = candidates[j1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+
+    cols = np.flatnonzero(owner[1:])
+    return owner[1:][cols] - 1, cols
+
+
+# ------------------------------------------------------------------
+# Row similarity
+# ------------------------------------------------------------------
+# Rows are flattened to their leaf paths (flatten; a scalar row is the one
+# path ""), so nested records and lists of lists compare on their contents.
+# Each path is a column, scored for all row pairs at once, and averaged over
+# the paths either row has: numbers by relative closeness, booleans by
+# equality, everything else by the dot product of hashed word/trigram vectors.
+
+def _column_similarity(left, right):
+    """(len(left), len(right)) similarity of two columns of present values."""
+    if all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in left):
+        a = np.array([to_number(x) for x in left])[:, None]
+        b = np.array([to_number(x) for x in right])[None, :]
+        scale = np.maximum(np.abs(a), np.abs(b))
+        sim = 1.0 - np.abs(a - b) / np.where(scale > 0, scale, 1.0)
+        return np.nan_to_num(np.clip(sim, 0.0, 1.0))
+    if all(isinstance(x, bool) for x in left):
+        a = np.array([to_bool(x) for x in left], dtype=object)[:, None]
+        b = np.array([to_bool(x) for x in right], dtype=object)[None, :]
+        return (a == b).astype(float)
+    a = hash_vectors([str(x) for x in left])
+    b = hash_vectors([str(x) for x in right])
+    return np.clip(a @ b.T, 0.0, 1.0)
+
+
+def _row_similarity(truth_rows, pred_rows):
+    # (similarity, shared): shared[i, j] is whether the rows have any leaf path in common.
+    truth_rows = [flatten(r) for r in truth_rows]
+    pred_rows = [flatten(r) for r in pred_rows]
+    n, m = len(truth_rows), len(pred_rows)
+    total = np.zeros((n, m))
+    keys_seen = np.zeros((n, m))
+    shared = np.zeros((n, m), dtype=bool)
+    for key in dict.fromkeys(k for r in truth_rows + pred_rows for k in r):
+        t_has = np.array([key in r for r in truth_rows])
+        p_has = np.array([key in r for r in pred_rows])
+        keys_seen += t_has[:, None] | p_has[None, :]
+        ti, pi = np.flatnonzero(t_has), np.flatnonzero(p_has)
+        if ti.size and pi.size:
+            shared[np.ix_(ti, pi)] = True
+            total[np.ix_(ti, pi)] += _column_similarity([truth_rows[i][key] for i in ti],
+                                                        [pred_rows[j][key] for j in pi])
+    return np.divide(total, keys_seen, out=np.zeros((n, m)), where=keys_seen > 0), shared
+
+
+def row_similarity(truth_rows, pred_rows):
+    """(len(truth_rows), len(pred_rows)) similarity of list rows, in [0, 1]."""
+    return _row_similarity(truth_rows, pred_rows)[0]
+
+
+# ------------------------------------------------------------------
+# Aligning a prediction to the truth
+# ------------------------------------------------------------------
+# Pairs scoring under MIN_ROW_SIMILARITY are left unmatched rather than
+# forced together: the truth row is then missing and the extracted row
+# hallucinated. A list whose rows share no leaf path with any truth row
+# gives nothing to match on, and keeps its index order.
+MIN_ROW_SIMILARITY = 0.25
+
+
+def align(truth, prediction, min_similarity=MIN_ROW_SIMILARITY):
+    """
+    (aligned, moved): prediction with every list reordered so row i is the
+    extracted row matched to truth row i (None where nothing matched, extra
+    rows after the truth's), and {aligned path prefix: original prefix} for
+    rows whose index changed.
+    """
+    moved = {}
+    return _align(truth, prediction, "", "", min_similarity, moved), moved
+
+
+def _align(truth, prediction, path, original, min_similarity, moved):
+    if isinstance(truth, dict) and isinstance(prediction, dict):
+        out = {}
+        for k, v in prediction.items():
+            if k in truth:
+                v = _align(truth[k], v, f"{path}.{k}" if path else k, f"{original}.{k}" if original else k,
+                           min_similarity, moved)
+            out[k] = v
+        return out
+    if not (isinstance(truth, list) and isinstance(prediction, list)) or not truth or not prediction:
+        return prediction
+
+    sim, shared = _row_similarity(truth, prediction)
+    if not shared.any():
+        return [_align(truth[i] if i < len(truth) else None, p, f"{path}[{i}]", f"{original}[{i}]",
+                       min_similarity, moved)
+                for i, p in enumerate(prediction)]
+    rows, cols = linear_sum_assignment(-sim)
+    keep = sim[rows, cols] >= min_similarity
+    match = dict(zip(rows[keep].tolist(), cols[keep].tolist()))
+    matched = set(match.values())
+    order = [match.get(i) for i in range(len(truth))]
+    order += [j for j in range(len(prediction)) if j not in matched]
+
+    aligned = []
+    for i, j in enumerate(order):
+        if j is None:
+            aligned.append(None)
+            continue
+        if i != j:
+            moved[f"{path}[{i}]"] = f"{original}[{j}]"
+        t = truth[i] if i < len(truth) else None
+        aligned.append(_align(t, prediction[j], f"{path}[{i}]", f"{original}[{j}]", min_similarity, moved))
+    return aligned
@@ -0,0 +1,247 @@
+import csv
+import json
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+from .report import evaluate
+
+# ------------------------------------------------------------------
+# Manifest
+# ------------------------------------------------------------------
+
+
+def read_manifest(path):
+    """
+    (id, ground_truth, prediction) entries from a JSONL manifest (one object
+    per line) or a .csv with a header row, each with ground_truth and
+    prediction paths and an optional id. Relative paths are taken from the
+    manifest's directory; id defaults to the prediction path.
+    """
+    path = Path(path)
+    with open(path, newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    entries = []
+    for row in rows:
+        truth, prediction = (str(path.parent / row[k]) for k in ("ground_truth", "prediction"))
+        entries.append((str(row.get("id") or row["prediction"]), truth, prediction))
+    ids = [e[0] for e in entries]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{path}: manifest ids are not unique")
+    return entries
+
+
+def load_records(path):
+    """Per-document records from a corpus results JSONL, skipping a torn last line."""
+    with open(path, "rb") as f:
+        return [json.loads(line) for line in f if line.endswith(b"\n")]
+
+
+def _latest(records):
+    # One record per id, the last written (a resumed run retries failures).
+    return list({r["id"]: r for r in records}.values())
+
+
+# ------------------------------------------------------------------
+# Parallel evaluation
+# ------------------------------------------------------------------
+# Each worker builds its own scorers once, in the pool initializer: embedding
+# and verdict caches are per-process handles, but both are safe to share on
+# disk, so workers reuse each other's embeddings and verdicts.
+
+_worker = {}
+
+
+def _init_worker(make_scorers, align_lists, keep_fields):
+    semantic, judge = make_scorers() if make_scorers is not None else (None, None)
+    _worker.update(semantic=semantic, judge=judge, align_lists=align_lists, keep_fields=keep_fields)
+
+
+def _evaluate_entry(entry):
+    doc_id, truth_path, prediction_path = entry
+    record = {"id": doc_id, "ground_truth": truth_path, "prediction": prediction_path}
+    t0 = time.perf_counter()
+    try:
+        with open(truth_path) as f:
+            truth = json.load(f)
+        with open(prediction_path) as f:
+            prediction = json.load(f)
+        results = evaluate(truth, prediction, _worker["semantic"], _worker["judge"], _worker["align_lists"])
+    except Exception as e:
+        # A document that can't be read or scored (unreadable file, embedder
+        # or judge failure, unexpected shapes) is reported and left out of the
+        # aggregates; raising here would end the pool.map and the whole run.
+        record["error"] = f"{type(e).__name__}: {e}"
+        return record
+    if not _worker["keep_fields"]:
+        del results["field_evaluations"]
+    record.update(results)
+    record["seconds"] = round(time.perf_counter() - t0, 4)
+    return record
+
+
+def _complete_lines(path):
+    # Cut a torn last line left by an interrupted run, so appends start on a fresh line.
+    with open(path, "rb+") as f:
+        data = f.read()
+        f.truncate(data.rfind(b"\n") + 1)
+
+
+def evaluate_corpus(entries, out_path, make_scorers=None, workers=None, chunk_size=8, align_lists=True,
+                    keep_fields=False, resume=False):
+    """
+    Evaluate manifest entries in a process pool, appending one JSON record
+    per document to out_path as results arrive (in manifest order), and
+    return the records. make_scorers is a picklable callable returning
+    (semantic, judge), called once per worker. workers=1 runs in-process,
+    None uses one per CPU. Records drop field_evaluations unless keep_fields.
+    With resume, documents out_path already scored without error are kept
+    and not re-run.
+    """
+    out_path = Path(out_path)
+    records = []
+    if resume and out_path.exists():
+        _complete_lines(out_path)
+        records = [r for r in _latest(load_records(out_path)) if "error" not in r]
+        done = {r["id"] for r in records}
+        entries = [e for e in entries if e[0] not in done]
+    init = (make_scorers, align_lists, keep_fields)
+
+    with open(out_path, "a" if resume else "w") as out:
+        def write(record):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            records.append(record)
+
+        if workers == 1:
+            _init_worker(*init)
+            try:
+                for entry in entries:
+                    write(_evaluate_entry(entry))
+            finally:
+                if _worker["judge"] is not None:
+                    _worker["judge"].close()
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init) as pool:
+                for record in pool.map(_evaluate_entry, entries, chunksize=chunk_size):
+                    write(record)
+    return records
+
+
+# ------------------------------------------------------------------
+# Corpus aggregates
+# ------------------------------------------------------------------
+# Every overall metric and every category metric is one column of a
+# documents x metrics matrix; a category a document has no fields in is NaN
+# there and left out of that column's mean. Intervals are percentile
+# bootstraps over documents, so they hold for skewed and bounded metrics
+# without a distributional assumption.
+
+
+def _metric_matrix(records, keys=None):
+    rows = []
+    for r in records:
+        row = {("overall_metrics", name): float(v) for name, v in r["overall_metrics"].items()}
+        for cat, scores in r["category_scores"].items():
+            row.update({("category_scores", cat, name): float(v) for name, v in scores.items()})
+        rows.append(row)
+    if keys is None:
+        keys = list(dict.fromkeys(k for row in rows for k in row))
+    matrix = np.array([[row.get(k, np.nan) for k in keys] for row in rows], dtype=float)
+    return keys, matrix.reshape(len(rows), len(keys))
+
+
+def bootstrap_ci(values, confidence=0.95, n_boot=1000, seed=0, block=250):
+    """
+    (mean, low, high) for each column of values (documents x metrics, NaN =
+    not observed): the mean over observed documents and a percentile
+    bootstrap interval from n_boot resamples of the documents.
+    """
+    values = np.asarray(values, dtype=float)
+    n, k = values.shape
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=0) / present.sum(axis=0)
+        if n == 0 or n_boot == 0:
+            return mean, mean.copy(), mean.copy()
+        rng = np.random.default_rng(seed)
+        boots = np.empty((n_boot, k))
+        for start in range(0, n_boot, block):
+            # A resample is a multinomial count per document, so a block of
+            # resamples is two matrix products rather than a gather per sample.
+            w = rng.multinomial(n, np.full(n, 1.0 / n), size=min(block, n_boot - start)).astype(float)
+            boots[start:start + len(w)] = (w @ filled) / (w @ present)
+    tail = (1.0 - confidence) / 2 * 100
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # a column no document observes stays NaN
+        low, high = np.nanpercentile(boots, [tail, 100 - tail], axis=0)
+    return mean, low, high
+
+
+def _num(x):
+    return None if np.isnan(x) else float(x)
+
+
+def _nest(keys, columns):
+    # {"overall_metrics": {metric: stat}, "category_scores": {category: {metric: stat}}}
+    out = {"overall_metrics": {}, "category_scores": {}}
+    for key, stat in zip(keys, columns):
+        if key[0] == "overall_metrics":
+            out["overall_metrics"][key[1]] = stat
+        else:
+            out["category_scores"].setdefault(key[1], {})[key[2]] = stat
+    return out
+
+
+def aggregate(records, confidence=0.95, n_boot=1000, seed=0):
+    """
+    Corpus summary of per-document records: for each overall and category
+    metric, the mean across documents with a confidence interval and the
+    number of documents it covers. Failed documents are listed, not scored.
+    """
+    latest = _latest(records)
+    scored = [r for r in latest if "error" not in r]
+    keys, matrix = _metric_matrix(scored)
+    mean, low, high = bootstrap_ci(matrix, confidence, n_boot, seed)
+    counts = (~np.isnan(matrix)).sum(axis=0)
+    stats = [{"mean": _num(m), "ci_low": _num(lo), "ci_high": _num(hi), "n": int(c)}
+             for m, lo, hi, c in zip(mean, low, high, counts)]
+    return {
+        "documents": len(scored),
+        "failed": [r["id"] for r in latest if "error" in r],
+        "confidence": confidence,
+        "bootstrap_samples": n_boot,
+        **_nest(keys, stats),
+    }
+
+
+def compare(baseline, records, confidence=0.95, n_boot=1000, seed=0):
+    """
+    Paired change from baseline records to records (e.g. two extractor
+    versions over one manifest), on the documents both scored: per metric,
+    the mean per-document difference with a bootstrap interval. An interval
+    that excludes 0 is a change the corpus supports, not resampling noise.
+    """
+    before = {r["id"]: r for r in _latest(baseline) if "error" not in r}
+    after = {r["id"]: r for r in _latest(records) if "error" not in r}
+    ids = [i for i in after if i in before]
+    old_keys, old = _metric_matrix([before[i] for i in ids])
+    new_keys, new = _metric_matrix([after[i] for i in ids])
+    keys = list(dict.fromkeys(old_keys + new_keys))
+    if keys != old_keys or keys != new_keys:
+        _, old = _metric_matrix([before[i] for i in ids], keys)
+        _, new = _metric_matrix([after[i] for i in ids], keys)
+    diff = new - old
+    delta, low, high = bootstrap_ci(diff, confidence, n_boot, seed)
+    counts = (~np.isnan(diff)).sum(axis=0)
+    stats = [{"delta": _num(d), "ci_low": _num(lo), "ci_high": _num(hi), "n": int(c)}
+             for d, lo, hi, c in zip(delta, low, high, counts)]
+    return {"documents": len(ids), **_nest(keys, stats)}
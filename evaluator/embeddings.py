@@ -0,0 +1,225 @@
+import fcntl
+import json
+import os
+import re
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+# ------------------------------------------------------------------
+# Embedding backends
+# ------------------------------------------------------------------
+# An embedder has a .name that identifies its vector space (model and
+# dimension; it names the cache directory), a .dim, and
+# embed(texts) -> float32 array (len(texts), dim) of unit-length rows.
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash_vector(text, dim):
+    text = " ".join(text.lower().split())
+    grams = text.split() + [text[i:i + 3] for i in range(len(text) - 2)]
+    hashes = np.array([zlib.crc32(g.encode("utf-8")) for g in grams] or [0], dtype=np.uint64)
+    signs = np.where(hashes & (1 << 31), -1.0, 1.0)
+    out = np.bincount((hashes % dim).astype(np.intp), weights=signs, minlength=dim).astype(np.float32)
+    norm = np.linalg.norm(out)
+    out = out / norm if norm > 0 else out
+    out.flags.writeable = False  # shared by every caller
+    return out
+
+
+def hash_vectors(texts, dim=256):
+    """
+    Unit-length signed counts of each text's words and character trigrams,
+    hashed into dim buckets: a cheap lexical vector whose dot products
+    approximate word/spelling overlap. Memoised per text.
+    """
+    if not texts:
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.stack([_hash_vector(text, dim) for text in texts])
+
+
+class FakeEmbedder:
+    """
+    Deterministic offline embedder for tests and benchmarks: hash_vectors(),
+    so strings sharing words or spelling land close together. Not a
+    semantic model.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f"fake-{dim}"
+
+    def embed(self, texts):
+        return hash_vectors(texts, self.dim)
+
+
+def _import_sentence_transformers():
+    try:
+        import sentence_transformers
+    except ImportError as e:
+        raise ImportError("the local embedding backend requires sentence-transformers "
+                          "(pip install sentence-transformers)") from e
+    return sentence_transformers
+
+
+class LocalEmbedder:
+    """A sentence-transformers model run in-process; model may be a name or a local path."""
+
+    def __init__(self, model="all-MiniLM-L6-v2", batch_size=256, device=None):
+        st = _import_sentence_transformers()
+        self.model = st.SentenceTransformer(model, device=device)
+        self.batch_size = batch_size
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"local-{Path(model).name}-{self.dim}"
+
+    def embed(self, texts):
+        return self.model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True,
+                                 normalize_embeddings=True, show_progress_bar=False).astype(np.float32)
+
+
+EMBEDDERS = {"fake": FakeEmbedder, "local": LocalEmbedder}
+
+
+def make_embedder(backend="fake", **kwargs):
+    return EMBEDDERS[backend](**kwargs)
+
+
+# ------------------------------------------------------------------
+# Persistent vector cache
+# ------------------------------------------------------------------
+# One directory per embedder: vectors.f32 is a row-major float32 matrix read
+# through np.memmap, strings.jsonl the string of each row, in row order.
+# Appends take an exclusive flock so parallel workers can share a cache;
+# each reader picks up rows other processes added on its next lookup.
+
+DEFAULT_EMBEDDING_CACHE_DIR = Path(os.environ.get("EVALUATOR_CACHE", Path.home() / ".cache" / "evaluator")) / "embeddings"
+
+
+class EmbeddingCache:
+    def __init__(self, embedder, path=DEFAULT_EMBEDDING_CACHE_DIR):
+        self.embedder = embedder
+        self.dir = Path(path) / re.sub(r"[^\w.-]+", "_", embedder.name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.dir / "vectors.f32"
+        self.index_path = self.dir / "strings.jsonl"
+        self.rows = {}
+        self._n_rows = 0
+        self._index_offset = 0
+        self._vectors = np.zeros((0, embedder.dim), dtype=np.float32)
+
+    @contextmanager
+    def _locked(self):
+        with open(self.dir / "lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        # Pick up rows appended since the last read (by this or another process).
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write from a crashed process; rewritten on next append
+                self.rows.setdefault(json.loads(line), self._n_rows)
+                self._n_rows += 1
+                self._index_offset += len(line)
+        n = self._n_rows
+        if n and n != len(self._vectors):
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n, self.embedder.dim))
+
+    def _append(self, strings, vectors):
+        with self._locked():
+            self._refresh()
+            keep = [i for i, s in enumerate(strings) if s not in self.rows]
+            if keep:
+                n = self._n_rows
+                # Drop anything past the last indexed row before appending.
+                for path, size in ((self.vectors_path, n * self.embedder.dim * 4), (self.index_path, self._index_offset)):
+                    with open(path, "ab") as f:
+                        f.truncate(size)
+                with open(self.vectors_path, "ab") as f:
+                    f.write(np.ascontiguousarray(vectors[keep], dtype=np.float32).tobytes())
+                with open(self.index_path, "ab") as f:
+                    f.write("".join(json.dumps(strings[i]) + "\n" for i in keep).encode("utf-8"))
+            self._refresh()
+
+    def lookup(self, strings, batch_size=1024):
+        """
+        (vectors, rows, n_embedded): the cached vector matrix, each string's row
+        in it, and how many strings had to be embedded (in batches of batch_size).
+        """
+        self._refresh()
+        missing = [s for s in dict.fromkeys(strings) if s not in self.rows]
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i:i + batch_size]
+            self._append(batch, self.embedder.embed(batch))
+        rows = np.fromiter((self.rows[s] for s in strings), dtype=np.intp, count=len(strings))
+        return self._vectors, rows, len(missing)
+
+
+class _MemoryCache(EmbeddingCache):
+    """EmbeddingCache held in memory, for runs that shouldn't touch disk."""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.rows = {}
+        self._vectors = np.zeros((0, embedder.dim), dtype=np.float32)
+
+    def _refresh(self):
+        pass
+
+    def _append(self, strings, vectors):
+        keep = [i for i, s in enumerate(strings) if s not in self.rows]
+        for i in keep:
+            self.rows[strings[i]] = len(self.rows)
+        self._vectors = np.concatenate([self._vectors, vectors[keep].astype(np.float32)])
+
+
+# ------------------------------------------------------------------
+# Semantic similarity
+# ------------------------------------------------------------------
+class SemanticScorer:
+    """
+    Cosine similarity between strings. Each distinct string is embedded once
+    (then cached), and scores come from one product over the cached vectors.
+    """
+
+    def __init__(self, embedder, cache_dir=DEFAULT_EMBEDDING_CACHE_DIR, batch_size=1024):
+        self.embedder = embedder
+        self.cache = EmbeddingCache(embedder, cache_dir) if cache_dir is not None else _MemoryCache(embedder)
+        self.batch_size = batch_size
+        self.lookups = 0
+        self.embedded = 0
+
+    def _vectors(self, strings):
+        vectors, rows, embedded = self.cache.lookup(strings, self.batch_size)
+        self.lookups += len(strings)
+        self.embedded += embedded
+        return vectors, rows
+
+    def prefetch(self, strings):
+        """Embed and cache strings ahead of scoring, e.g. a whole corpus's text fields at once."""
+        self._vectors(list(dict.fromkeys(strings)))
+
+    def similarity(self, truths, preds):
+        """Pairwise cosine similarity of truths[i] and preds[i], clipped to [0, 1]."""
+        vectors, rows = self._vectors(list(truths) + list(preds))
+        a, b = vectors[rows[:len(truths)]], vectors[rows[len(truths):]]
+        return np.clip(np.einsum("ij,ij->i", a, b), 0.0, 1.0).astype(float)
+
+    def matrix(self, left, right):
+        """Cosine similarity of every string in left against every string in right."""
+        vectors, rows = self._vectors(list(left) + list(right))
+        a, b = vectors[rows[:len(left)]], vectors[rows[len(left):]]
+        return np.clip(a @ b.T, 0.0, 1.0).astype(float)
+
+    def stats(self):
+        return {"lookups": self.lookups, "embedded": self.embedded, "cached_strings": len(self.cache.rows)}
@@ -0,0 +1,87 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+
+# ------------------------------------------------------------------
+# Path-indexed records
+# ------------------------------------------------------------------
+# Both documents are flattened to {path: leaf value}, paths written the way
+# they appear in evaluation_results.json:
+#   property_damage_cover.loss_history[2].status
+#   risk_management.iso_certifications[0]
+# Nulls and empty containers are not fields: a null prediction is missing.
+
+_INDEX = re.compile(r"\[\d+\]")
+
+
+def flatten(obj, prefix=""):
+    """{path: leaf value} in document order."""
+    out = {}
+    stack = [(prefix, obj)]
+    while stack:
+        path, value = stack.pop()
+        if isinstance(value, dict):
+            items = [(f"{path}.{k}" if path else str(k), v) for k, v in value.items()]
+        elif isinstance(value, list):
+            items = [(f"{path}[{i}]", v) for i, v in enumerate(value)]
+        else:
+            if value is not None:
+                out[path] = value
+            continue
+        stack.extend(reversed(items))
+    return out
+
+
+def category(path):
+    """Top-level section a path is scored under in category_scores."""
+    return _INDEX.sub("", path.split(".", 1)[0])
+
+
+def leaf_key(path):
+    return _INDEX.sub("", path.rsplit(".", 1)[-1])
+
+
+# ------------------------------------------------------------------
+# Field types
+# ------------------------------------------------------------------
+# "text" is free prose (compared for meaning), "string" a short label or
+# identifier. The schema's prose fields are named here; anything else that
+# runs to TEXT_MIN_WORDS words is treated as prose too.
+TEXT_KEYS = frozenset({
+    "business_description", "environmental_management_commitment", "occupancy", "description",
+    "risk_description", "product_description", "ppe_requirements", "training_programme",
+    "accident_reporting_system", "risk_assessments", "site_access_control", "waste_management",
+    "preventive_maintenance", "fire_risk_assessment", "hot_work_procedures", "staff_fire_safety_training",
+})
+TEXT_SUFFIXES = ("_description", "_details")
+TEXT_MIN_WORDS = 20
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%d %B %Y", "%d %b %Y", "%B %d, %Y")
+
+
+@lru_cache(maxsize=65536)
+def parse_date(text):
+    """datetime.date for the date formats seen in submissions, else None."""
+    text = text.strip()
+    if not 8 <= len(text) <= 20 or not text[0].isalnum():
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def field_type(path, value):
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    text = str(value)
+    if parse_date(text) is not None:
+        return "date"
+    key = leaf_key(path)
+    if key in TEXT_KEYS or key.endswith(TEXT_SUFFIXES) or len(text.split()) >= TEXT_MIN_WORDS:
+        return "text"
+    return "string"
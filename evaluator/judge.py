@@ -0,0 +1,281 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# ------------------------------------------------------------------
+# LLM judge for the ambiguous band
+# ------------------------------------------------------------------
+# Fields that match exactly, or that fuzzy/semantic scoring already places
+# clearly right (>= band high) or clearly wrong (< band low), keep their
+# semantic score. Only the rest go to the judge. They are deduplicated,
+# looked up in a verdict cache keyed by (truth, prediction, field_type), and
+# the misses are packed batch_size to a prompt. Batches run concurrently
+# under a concurrency cap and a requests-per-minute limit.
+
+JUDGE_MODEL = os.environ.get("EVALUATOR_JUDGE_MODEL", "gpt-5.2-2025-12-11")
+DEFAULT_VERDICT_CACHE_PATH = Path(os.environ.get("EVALUATOR_CACHE", Path.home() / ".cache" / "evaluator")) / "verdicts.sqlite"
+
+JUDGE_PROMPT = """You check data extracted from commercial insurance submissions against the ground truth.
+For each item, decide whether the extracted value means the same as the expected value for a field of that type.
+Score 1 if it is equivalent, 0.5 if it is partly right (incomplete, or right but imprecise), 0 if it is wrong.
+Reply with JSON only: {"verdicts": [{"id": <item id>, "score": <0, 0.5 or 1>}, ...]}, one verdict per item."""
+
+
+class MalformedVerdicts(ValueError):
+    """The judge's reply could not be read as verdicts; retried like a transient error."""
+
+
+class FakeJudge:
+    """
+    Deterministic offline judge for tests and benchmarks: word overlap
+    snapped to 0 / 0.5 / 1, after latency seconds per call.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.name = "fake"
+
+    async def verdicts(self, items):
+        await asyncio.sleep(self.latency)
+        out = []
+        for truth, prediction, _ in items:
+            a, b = set(re.findall(r"\w+", truth.lower())), set(re.findall(r"\w+", prediction.lower()))
+            overlap = len(a & b) / max(len(a | b), 1)
+            out.append(1.0 if overlap >= 0.6 else 0.5 if overlap >= 0.3 else 0.0)
+        return out
+
+
+class OpenAIJudge:
+    """Judge through the OpenAI chat API (or any compatible base_url)."""
+
+    def __init__(self, model=JUDGE_MODEL, base_url=None):
+        from openai import AsyncOpenAI
+        self.client = AsyncOpenAI(base_url=base_url)
+        self.model = model
+        self.name = f"openai-{model}"
+
+    def request(self, items):
+        payload = [{"id": i, "field_type": kind, "expected": truth, "extracted": prediction}
+                   for i, (truth, prediction, kind) in enumerate(items)]
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": JUDGE_PROMPT},
+                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+            ],
+            "response_format": {"type": "json_object"},
+        }
+
+    async def verdicts(self, items):
+        response = await self.client.chat.completions.create(**self.request(items))
+        try:
+            scores = {v["id"]: float(v["score"])
+                      for v in json.loads(response.choices[0].message.content)["verdicts"]}
+        except (TypeError, KeyError, ValueError) as e:
+            raise MalformedVerdicts(f"unreadable judge reply: {e!r}") from e
+        # An item the judge skipped comes back as None and keeps its semantic score.
+        return [min(max(scores[i], 0.0), 1.0) if i in scores else None for i in range(len(items))]
+
+    async def aclose(self):
+        await self.client.close()
+
+
+JUDGES = {"fake": FakeJudge, "openai": OpenAIJudge}
+
+
+def make_judge(backend="fake", **kwargs):
+    return JUDGES[backend](**kwargs)
+
+
+class VerdictCache:
+    """SQLite map from (judge, truth, prediction, field_type) to a verdict score."""
+
+    def __init__(self, path=DEFAULT_VERDICT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30)
+        self._db.execute("CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, score REAL NOT NULL)")
+        self._db.commit()
+
+    @staticmethod
+    def key(judge_name, item):
+        return hashlib.sha256(json.dumps([judge_name, *item]).encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        found = {}
+        for i in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            found.update(self._db.execute(f"SELECT key, score FROM verdicts WHERE key IN ({marks})", chunk))
+        return found
+
+    def put_many(self, scores):
+        self._db.executemany("INSERT OR REPLACE INTO verdicts VALUES (?, ?)", scores.items())
+        self._db.commit()
+
+
+class _MemoryVerdicts(VerdictCache):
+    def __init__(self):
+        self._scores = {}
+
+    def get_many(self, keys):
+        return {k: self._scores[k] for k in keys if k in self._scores}
+
+    def put_many(self, scores):
+        self._scores.update(scores)
+
+
+def retryable_errors():
+    """
+    Judge failures worth retrying: timeouts, malformed replies, and the
+    OpenAI SDK's connection, rate-limit and server errors (only if the SDK
+    was imported; the fake judge can't raise them).
+    """
+    errors = (asyncio.TimeoutError, MalformedVerdicts)
+    openai = sys.modules.get("openai")
+    if openai is not None:
+        errors += (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError,
+                   openai.InternalServerError)
+    return errors
+
+
+class RateLimiter:
+    """
+    Spaces request starts at least 60 / requests_per_minute seconds apart
+    (the slot is claimed without awaiting, so no lock).
+    """
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        delay = self._next - now
+        self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class JudgeScheduler:
+    """
+    Runs the judge over ambiguous fields. Counters accumulate across calls;
+    stats() reports them along with the calls and estimated time saved
+    against judging every inexact field in a call of its own.
+
+    Every score() runs on one event loop the scheduler keeps, since a
+    judge's async client holds connections bound to the loop that opened
+    them. Each request gets timeout seconds and up to retries retries with
+    exponential backoff; a batch that still fails keeps its fallback
+    scores. close() releases the client and the loop.
+    """
+
+    def __init__(self, judge, cache_path=DEFAULT_VERDICT_CACHE_PATH, band=(0.5, 0.9), batch_size=20,
+                 concurrency=4, requests_per_minute=60, timeout=120.0, retries=3, backoff=1.0):
+        self.judge = judge
+        self.cache = VerdictCache(cache_path) if cache_path is not None else _MemoryVerdicts()
+        self.band = band
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(requests_per_minute)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._loop = None
+        self.considered = self.in_band = self.cache_hits = self.judged = self.calls = 0
+        self.retried = self.failed_batches = 0
+        self.call_seconds = self.wall_seconds = 0.0
+
+    def ambiguous(self, scores):
+        """Mask of scores inside the band [low, high)."""
+        low, high = self.band
+        return (scores >= low) & (scores < high)
+
+    async def _call(self, batch):
+        for attempt in range(self.retries + 1):
+            await self.limiter.wait()
+            t0 = time.perf_counter()
+            try:
+                scores = await asyncio.wait_for(self.judge.verdicts(batch), self.timeout)
+            except retryable_errors():
+                if attempt == self.retries:
+                    raise
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random() / 2))
+                continue
+            self.call_seconds += time.perf_counter() - t0
+            self.calls += 1
+            return scores
+
+    async def _run(self, items):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(batch):
+            async with semaphore:
+                try:
+                    return await self._call(batch)
+                except retryable_errors():
+                    # Out of retries: these items keep their fallback scores
+                    # (and stay uncached) rather than failing the document.
+                    self.failed_batches += 1
+                    return [None] * len(batch)
+
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        results = await asyncio.gather(*(one(b) for b in batches))
+        return [score for scores in results for score in scores]
+
+    def score(self, items, fallback):
+        """
+        Verdicts for (truth, prediction, field_type) items, each in [0, 1];
+        an item the judge gives no verdict for keeps its fallback score.
+        """
+        t0 = time.perf_counter()
+        self.in_band += len(items)
+        keys = [VerdictCache.key(self.judge.name, item) for item in items]
+        known = self.cache.get_many(list(set(keys)))
+        self.cache_hits += sum(k in known for k in keys)
+        pending = {k: item for k, item in zip(keys, items) if k not in known}
+        if pending:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            verdicts = self._loop.run_until_complete(self._run(list(pending.values())))
+            self.judged += len(pending)
+            fresh = {k: v for k, v in zip(pending, verdicts) if v is not None}
+            self.cache.put_many(fresh)
+            known.update(fresh)
+        self.wall_seconds += time.perf_counter() - t0
+        return np.array([known.get(k, f) for k, f in zip(keys, fallback)], dtype=float)
+
+    def close(self):
+        if self._loop is None:
+            return
+        if hasattr(self.judge, "aclose"):
+            self._loop.run_until_complete(self.judge.aclose())
+        self._loop.close()
+        self._loop = None
+
+    def stats(self):
+        # Baseline: every inexact field judged alone, one call after another,
+        # each taking the measured call time or the rate-limit spacing.
+        per_call = max(self.call_seconds / self.calls if self.calls else 0.0, self.limiter.interval)
+        return {
+            "fields_considered": self.considered,
+            "fields_in_band": self.in_band,
+            "cache_hits": self.cache_hits,
+            "fields_judged": self.judged,
+            "judge_calls": self.calls,
+            "judge_retries": self.retried,
+            "failed_batches": self.failed_batches,
+            "judge_seconds": round(self.wall_seconds, 3),
+            "calls_saved": self.considered - self.calls,
+            "est_seconds_saved": round(max(self.considered * per_call - self.wall_seconds, 0.0), 3),
+        }
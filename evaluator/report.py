@@ -0,0 +1,174 @@
+import json
+import re
+
+import numpy as np
+
+from .align import align
+from .flatten import category, field_type, flatten
+from .scoring import score_records
+
+# ------------------------------------------------------------------
+# evaluation_results.json
+# ------------------------------------------------------------------
+# Rates are means over every ground-truth field (a missing field scores 0);
+# coverage and hallucination rate are over all fields, hallucinations
+# included. With a SemanticScorer, text fields' semantic_score is the
+# embedding similarity; other fields (and every field without one) reuse the
+# fuzzy score. llm_judge_score is the same mean with a JudgeScheduler's
+# verdicts substituted for the ambiguous fields, or semantic_similarity
+# without one.
+
+SEMANTIC_TYPES = frozenset({"text"})
+
+
+def _mean(values):
+    return float(values.mean()) if values.size else 0.0
+
+
+def structure_valid(truth, prediction):
+    """The prediction is an object and shares the truth's container type for every section it has."""
+    if not isinstance(prediction, dict):
+        return False
+    return all(isinstance(prediction[k], type(v)) for k, v in truth.items()
+               if k in prediction and isinstance(v, (dict, list)))
+
+
+def _original_path(path, moved):
+    # Longest list-row prefix of path that alignment moved, rewritten.
+    for m in reversed(list(re.finditer(r"\[\d+\]", path))):
+        prefix = path[:m.end()]
+        if prefix in moved:
+            return moved[prefix] + path[m.end():]
+    return None
+
+
+def evaluate(truth, prediction, semantic=None, judge=None, align_lists=True):
+    """
+    Score prediction against truth; returns the evaluation_results.json
+    document. semantic is an optional embeddings.SemanticScorer, judge an
+    optional judge.JudgeScheduler. With align_lists, list rows are matched
+    by content (align.align) rather than compared by index.
+    """
+    moved = {}
+    if align_lists and isinstance(prediction, dict):
+        prediction, moved = align(truth, prediction)
+    truth_fields = flatten(truth)
+    pred_fields = flatten(prediction) if isinstance(prediction, dict) else {}
+    paths = list(truth_fields) + [p for p in pred_fields if p not in truth_fields]
+    n = len(paths)
+
+    in_truth = np.fromiter((p in truth_fields for p in paths), dtype=bool, count=n)
+    in_pred = np.fromiter((p in pred_fields for p in paths), dtype=bool, count=n)
+    missing = in_truth & ~in_pred
+    hallucinated = in_pred & ~in_truth
+    types = [field_type(p, truth_fields[p] if p in truth_fields else pred_fields[p]) for p in paths]
+
+    exact = np.zeros(n, dtype=bool)
+    fuzzy = np.zeros(n, dtype=float)
+    notes = [""] * n
+    both = np.flatnonzero(in_truth & in_pred)
+    if both.size:
+        exact[both], fuzzy[both], both_notes = score_records(
+            [types[i] for i in both],
+            [truth_fields[paths[i]] for i in both],
+            [pred_fields[paths[i]] for i in both],
+        )
+        for i, note in zip(both, both_notes):
+            notes[i] = note
+    for i in np.flatnonzero(missing):
+        notes[i] = "Field missing in extraction"
+    for i in np.flatnonzero(hallucinated):
+        notes[i] = "Field not in ground truth (hallucination)"
+    if moved:
+        for i in np.flatnonzero(in_pred):
+            source = _original_path(paths[i], moved)
+            if source is not None:
+                notes[i] = f"{notes[i]}; extracted as {source}" if notes[i] else f"Extracted as {source}"
+    semantic_scores = fuzzy.copy()
+    if semantic is not None:
+        idx = np.array([i for i in both if types[i] in SEMANTIC_TYPES and not exact[i]], dtype=np.intp)
+        if idx.size:
+            semantic_scores[idx] = semantic.similarity([str(truth_fields[paths[i]]) for i in idx],
+                                                       [str(pred_fields[paths[i]]) for i in idx])
+
+    judge_scores = semantic_scores.copy()
+    if judge is not None:
+        inexact = both[~exact[both]]
+        judge.considered += inexact.size
+        idx = inexact[judge.ambiguous(np.maximum(fuzzy[inexact], semantic_scores[inexact]))]
+        if idx.size:
+            items = [(str(truth_fields[paths[i]]), str(pred_fields[paths[i]]), types[i]) for i in idx]
+            judge_scores[idx] = judge.score(items, semantic_scores[idx])
+            for i in idx:
+                notes[i] = f"{notes[i]}; LLM judge: {judge_scores[i]:g}" if notes[i] else f"LLM judge: {judge_scores[i]:g}"
+
+    scored = ~hallucinated
+    semantic_similarity = _mean(semantic_scores[scored])
+    overall = {
+        "structure_validity": structure_valid(truth, prediction),
+        "field_coverage": _mean(~missing),
+        "exact_match_rate": _mean(exact[scored]),
+        "fuzzy_match_rate": _mean(fuzzy[scored]),
+        "semantic_similarity": semantic_similarity,
+        "llm_judge_score": _mean(judge_scores[scored]),
+        "hallucination_rate": _mean(hallucinated),
+    }
+
+    # Per-category sums in one pass: bincount over each record's category.
+    names, first, cat = np.unique([category(p) for p in paths], return_index=True, return_inverse=True)
+    k = len(names)
+    n_all = np.bincount(cat, minlength=k)
+    n_scored = np.bincount(cat, weights=scored, minlength=k)
+
+    def rate(values, over=n_scored):
+        sums = np.bincount(cat, weights=values * scored, minlength=k)
+        return np.divide(sums, over, out=np.zeros(k), where=over > 0)
+
+    columns = {
+        "exact_match": rate(exact),
+        "fuzzy_score": rate(fuzzy),
+        "semantic_score": rate(semantic_scores),
+        "coverage": np.bincount(cat, weights=~missing, minlength=k) / n_all,
+        "hallucination_count": np.bincount(cat, weights=hallucinated, minlength=k).astype(int),
+    }
+    category_scores = {
+        str(names[c]): {name: column[c].item() for name, column in columns.items()}
+        for c in np.argsort(first)  # document order
+    }
+
+    field_evaluations = [
+        {
+            "path": path,
+            "field_type": kind,
+            "exact_match": e,
+            "fuzzy_score": f,
+            "semantic_score": s,
+            "is_missing": m,
+            "is_hallucinated": h,
+            "notes": note,
+        }
+        for path, kind, e, f, s, m, h, note in zip(
+            paths, types, exact.tolist(), fuzzy.tolist(), semantic_scores.tolist(),
+            missing.tolist(), hallucinated.tolist(), notes,
+        )
+    ]
+    return {
+        "overall_metrics": overall,
+        "category_scores": category_scores,
+        "missing_fields": [p for p, m in zip(paths, missing) if m],
+        "hallucinated_fields": [p for p, h in zip(paths, hallucinated) if h],
+        "field_evaluations": field_evaluations,
+    }
+
+
+def evaluate_files(truth_path, prediction_path, out_path=None, semantic=None, judge=None, align_lists=True):
+    """evaluate() two JSON files, optionally writing the result to out_path."""
+    with open(truth_path) as f:
+        truth = json.load(f)
+    with open(prediction_path) as f:
+        prediction = json.load(f)
+    results = evaluate(truth, prediction, semantic, judge, align_lists)
+    if out_path is not None:
+        with open(out_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
@@ -0,0 +1,135 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from .flatten import parse_date
+
+# ------------------------------------------------------------------
+# Exact and fuzzy scores, a batch of records at a time
+# ------------------------------------------------------------------
+# score_records() takes every record present on both sides, groups them by
+# field type and scores each group with array operations: numbers and
+# booleans entirely in NumPy, strings through a bit-parallel LCS that is
+# memoised on the (truth, prediction) pair, since labels recur constantly
+# across a corpus.
+
+# Relative error at which a number's fuzzy score has decayed to 0.
+NUMERIC_TOLERANCE = 0.1
+
+_NUMBER_JUNK = re.compile(r"[£$€,\s%]")
+
+
+def to_number(value):
+    """float for numbers and numeric strings ('£125,000'), NaN otherwise."""
+    if isinstance(value, bool):
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(_NUMBER_JUNK.sub("", str(value)))
+    except ValueError:
+        return np.nan
+
+
+def to_bool(value):
+    """True/False for booleans and yes/no style strings, None otherwise."""
+    if isinstance(value, bool):
+        return value
+    return {"true": True, "yes": True, "y": True, "false": False, "no": False, "n": False}.get(
+        str(value).strip().lower())
+
+
+@lru_cache(maxsize=1 << 16)
+def fuzzy_ratio(a, b):
+    """
+    Indel similarity 2 * LCS / (len(a) + len(b)) of the lowercased strings,
+    the LCS computed bit-parallel (Hyyrö) with a Python int as the bit vector.
+    """
+    a, b = a.strip().lower(), b.strip().lower()
+    if not a or not b:
+        return float(a == b)
+    if len(a) > len(b):
+        a, b = b, a
+    masks = {}
+    for i, ch in enumerate(a):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    full = (1 << len(a)) - 1
+    v = full
+    for ch in b:
+        u = v & masks.get(ch, 0)
+        v = ((v + u) | (v - u)) & full
+    lcs = len(a) - bin(v).count("1")
+    return 2 * lcs / (len(a) + len(b))
+
+
+def _score_numbers(truths, preds, exact, fuzzy, notes, idx):
+    t = np.array([to_number(v) for v in truths], dtype=float)
+    p = np.array([to_number(v) for v in preds], dtype=float)
+    diff = np.abs(t - p)
+    scale = np.where(t != 0, np.abs(t), 1.0)
+    rel = diff / scale
+    ok = ~np.isnan(p)
+    equal = ok & (diff <= 1e-9 * scale)
+    exact[idx] = equal
+    fuzzy[idx] = np.where(ok, np.clip(1.0 - rel / NUMERIC_TOLERANCE, 0.0, 1.0), 0.0)
+    for k in np.flatnonzero(~equal):
+        if ok[k]:
+            notes[idx[k]] = f"Numeric difference: {diff[k]} ({rel[k] * 100:.1f}%)"
+        else:
+            notes[idx[k]] = f"Type mismatch: expected number, got {preds[k]!r}"
+
+
+def _score_booleans(truths, preds, exact, fuzzy, notes, idx):
+    t = [to_bool(v) for v in truths]
+    p = [to_bool(v) for v in preds]
+    equal = np.array([a is not None and a == b for a, b in zip(t, p)], dtype=bool)
+    exact[idx] = equal
+    fuzzy[idx] = equal
+    for k in np.flatnonzero(~equal):
+        notes[idx[k]] = f"Boolean mismatch: expected {t[k]}, got {p[k] if p[k] is not None else preds[k]!r}"
+
+
+def _score_dates(truths, preds, exact, fuzzy, notes, idx):
+    for k, (t, p) in enumerate(zip(truths, preds)):
+        same = parse_date(str(t)) == parse_date(str(p))
+        exact[idx[k]] = same
+        fuzzy[idx[k]] = float(same)
+        if same and str(t) != str(p):
+            notes[idx[k]] = "Dates match (different format)"
+        elif not same:
+            notes[idx[k]] = f"Date mismatch: expected {t}, got {p}"
+
+
+def _score_strings(truths, preds, exact, fuzzy, notes, idx):
+    t = np.array([str(v).strip() for v in truths], dtype=object)
+    p = np.array([str(v).strip() for v in preds], dtype=object)
+    equal = t == p
+    exact[idx] = equal
+    fuzzy[idx] = [1.0 if e else fuzzy_ratio(a, b) for e, a, b in zip(equal, t, p)]
+
+
+SCORERS = {
+    "number": _score_numbers,
+    "boolean": _score_booleans,
+    "date": _score_dates,
+    "string": _score_strings,
+    "text": _score_strings,
+}
+
+
+def score_records(types, truths, preds):
+    """
+    (exact bool array, fuzzy float array, notes list) for records present in
+    both documents, given each record's field type and two values.
+    """
+    n = len(types)
+    exact = np.zeros(n, dtype=bool)
+    fuzzy = np.zeros(n, dtype=float)
+    notes = [""] * n
+    types = np.asarray(types, dtype=object)
+    for kind, scorer in SCORERS.items():
+        idx = np.flatnonzero(types == kind)
+        if idx.size:
+            scorer([truths[i] for i in idx], [preds[i] for i in idx], exact, fuzzy, notes, idx)
+    return exact, fuzzy, notes
@@ -15,11 +15,24 @@ Rules enforced:
 4. Column names inferred ONLY if a header row is detected
 """
 
+import csv
+import hashlib
+import json
+import os
+import pickle
 import re
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from itertools import product
+import numpy as np
 import pdfplumber
 import pandas as pd
+from pdfplumber.page import test_proposed_bbox
+from pdfplumber.utils import clip_obj, extract_words
 
 
 # ------------------------------------------------------------------
@@ -114,10 +127,248 @@ def drop_sparse_columns_by_index(df, empty_thresh=0.9, data_only=True):
     return (df.iloc[:, keep_idx], keep_idx) if keep_idx else (df, list(range(df.shape[1])))
 
 
+# ------------------------------------------------------------------
+# Page char index (single pass over the char stream per page)
+# ------------------------------------------------------------------
+def build_char_index(page):
+    """
+    Sort the page's chars by top once so that per-cell lookups are a
+    bisection instead of a full page.crop() over every object on the page.
+    """
+    chars = sorted(enumerate(page.chars), key=lambda ic: ic[1]["top"])
+    return {
+        "tops": [c["top"] for _, c in chars],
+        "chars": chars,
+        "max_h": max((c["bottom"] - c["top"] for _, c in chars), default=0),
+    }
+
+
+def crop_chars(char_index, bbox):
+    """
+    Same chars as page.crop(bbox).chars: clipped to bbox, in stream order.
+    """
+    x0, y0, x1, y1 = bbox
+    tops = char_index["tops"]
+    # any char reaching into the bbox starts at most max_h above it
+    lo = bisect_left(tops, y0 - char_index["max_h"] - 1)
+    hi = bisect_right(tops, y1)
+
+    out = []
+    for _, c in sorted(char_index["chars"][lo:hi], key=lambda ic: ic[0]):
+        clipped = clip_obj(c, bbox)
+        if clipped is not None:
+            out.append(clipped)
+    return out
+
+
+# ------------------------------------------------------------------
+# Page analysis (shared per-page cache + stage timings)
+# ------------------------------------------------------------------
+LINES_TABLE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 3,
+    "join_tolerance": 3,
+}
+
+TEXT_TABLE_SETTINGS = {
+    'vertical_strategy': 'text',
+    'horizontal_strategy': 'text',
+    'snap_tolerance': 3,
+    'join_tolerance': 3,
+    'intersection_tolerance': 3,
+    'edge_min_length': 3,
+    'min_words_vertical': 1,
+    'min_words_horizontal': 1,
+}
+
+
+class StageTimings:
+    """
+    Wall time and call counts accumulated per extraction stage.
+
+    Stages nest (e.g. "words" runs inside "extract:borderless"), so a
+    parent's time includes its children.
+    """
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    @contextmanager
+    def stage(self, name):
+        ts = time.time()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, ts, time.perf_counter() - t0)
+
+    def _record(self, name, ts, secs):
+        self.seconds[name] += secs
+        self.calls[name] += 1
+
+    def count(self, name, n=1):
+        """Bump a plain counter (no time attached), e.g. cache hits."""
+        self.calls[name] += n
+
+    @contextmanager
+    def page(self, pdf_path, page_no):
+        """Scope for everything done for one page (timed as "page")."""
+        with self.stage("page"):
+            yield
+
+    def annotate(self, **info):
+        """Describe the current page; path= is also counted as path:<path>."""
+        if "path" in info:
+            self.count(f"path:{info['path']}")
+
+    def merge(self, other):
+        for name, secs in other.seconds.items():
+            self.seconds[name] += secs
+        for name, calls in other.calls.items():
+            self.calls[name] += calls
+        return self
+
+    def report(self):
+        lines = [f"{'stage':<22}{'calls':>8}{'total ms':>12}{'mean ms':>10}"]
+        for name in sorted(self.calls, key=lambda n: self.seconds.get(n, 0.0), reverse=True):
+            secs, calls = self.seconds.get(name, 0.0), self.calls[name]
+            lines.append(f"{name:<22}{calls:>8}{secs * 1000:>12.1f}{secs * 1000 / calls:>10.2f}")
+        return "\n".join(lines)
+
+
+class Tracer(StageTimings):
+    """
+    StageTimings that also keeps every span and one record per page (wall
+    time, stage times, word and table counts, the path taken), to find slow
+    documents in production batches. Export with to_json() or
+    to_chrome_trace() (chrome://tracing or https://ui.perfetto.dev).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.spans = []
+        self.pages = []
+        self._page = None
+
+    def _record(self, name, ts, secs):
+        super()._record(name, ts, secs)
+        self.spans.append((name, ts, secs, os.getpid()))
+        if self._page is not None and name != "page":
+            stages = self._page["stages"]
+            stages[name] = stages.get(name, 0.0) + secs
+
+    def count(self, name, n=1):
+        super().count(name, n)
+        if self._page is not None:
+            counts = self._page["counts"]
+            counts[name] = counts.get(name, 0) + n
+
+    @contextmanager
+    def page(self, pdf_path, page_no):
+        self._page = record = {
+            "pdf": str(pdf_path), "page_no": page_no, "path": None,
+            "seconds": 0.0, "stages": {}, "counts": {},
+        }
+        t0 = time.perf_counter()
+        try:
+            with self.stage("page"):
+                yield
+        finally:
+            record["seconds"] = time.perf_counter() - t0
+            self._page = None
+            self.pages.append(record)
+
+    def annotate(self, **info):
+        super().annotate(**info)
+        if self._page is not None:
+            self._page.update(info)
+
+    def merge(self, other):
+        super().merge(other)
+        if isinstance(other, Tracer):
+            self.spans.extend(other.spans)
+            self.pages.extend(other.pages)
+        return self
+
+    def to_json(self):
+        return {
+            "stages": {
+                name: {"calls": self.calls[name], "seconds": self.seconds.get(name, 0.0)}
+                for name in sorted(self.calls)
+            },
+            "pages": self.pages,
+        }
+
+    def to_chrome_trace(self):
+        events = [
+            {"name": name, "cat": name.split(":")[0], "ph": "X", "pid": pid, "tid": pid,
+             "ts": ts * 1e6, "dur": secs * 1e6}
+            for name, ts, secs, pid in self.spans
+        ]
+        return {"traceEvents": sorted(events, key=lambda e: e["ts"]), "displayTimeUnit": "ms"}
+
+    def save(self, path, fmt="json"):
+        data = self.to_chrome_trace() if fmt == "chrome" else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+
+
+class PageAnalysis:
+    """
+    Everything the bordered and borderless detectors read from a page,
+    computed at most once: the char index, the edge check and word lists
+    per (bbox, tolerances). Words for a bbox are built from the char index
+    and match page.crop(bbox).extract_words(...) exactly.
+    """
+
+    def __init__(self, page, timings=None):
+        self.page = page
+        self.timings = timings if timings is not None else StageTimings()
+        self._char_index = None
+        self._words = {}
+
+    @property
+    def char_index(self):
+        if self._char_index is None:
+            with self.timings.stage("chars"):
+                self._char_index = build_char_index(self.page)
+        return self._char_index
+
+    def words(self, bbox=None, **kwargs):
+        key = (bbox, tuple(sorted(kwargs.items())))
+        if key not in self._words:
+            if bbox is None:
+                chars = self.page.chars
+            else:
+                test_proposed_bbox(bbox, self.page.bbox)
+                chars = crop_chars(self.char_index, bbox)
+            with self.timings.stage("words"):
+                self._words[key] = extract_words(chars, **kwargs)
+            self.timings.count("words:extracted", len(self._words[key]))
+        return self._words[key]
+
+    def find_tables(self, table_settings):
+        strategy = table_settings["vertical_strategy"]
+        with self.timings.stage(f"find_tables:{strategy}"):
+            # No ruling lines at all means the lines strategy cannot find a table.
+            if strategy == "lines" and not self.page.edges:
+                return []
+            tables = self.page.find_tables(table_settings=table_settings)
+        self.timings.count(f"tables:{strategy}", len(tables))
+        return tables
+
+
 # ------------------------------------------------------------------
 # Bordered tables (unchanged logic from last version)
 # ------------------------------------------------------------------
-def extract_bordered_table(page, table):
+def extract_bordered_table(page, table, single_pass=True, analysis=None):
+    """
+    single_pass=True reads the page's chars once and assigns them to cells
+    through build_char_index(); single_pass=False crops the page per cell
+    (the original path, kept for benchmarking). Both give the same grid.
+    """
 
     raw_col_bounds = [(c.bbox[0], c.bbox[2]) for c in table.columns]
     col_bounds = merge_overlapping_columns(raw_col_bounds)
@@ -127,10 +378,16 @@ def extract_bordered_table(page, table):
     row_tops = sorted({round(c[1], 1) for c in table.cells})
     grid = [[""] * ncols for _ in row_tops]
 
+    if single_pass:
+        char_index = (analysis or PageAnalysis(page)).char_index
+
     for bbox in table.cells:
         x0, y0, x1, y1 = bbox
-        cropped = page.crop(bbox)
-        words = cropped.extract_words(x_tolerance=2, y_tolerance=3)
+        if single_pass:
+            words = extract_words(crop_chars(char_index, bbox), x_tolerance=2, y_tolerance=3)
+        else:
+            cropped = page.crop(bbox)
+            words = cropped.extract_words(x_tolerance=2, y_tolerance=3)
 
         lines = defaultdict(list)
         for w in words:
@@ -158,8 +415,9 @@ def extract_bordered_table(page, table):
 # BORDERLESS TABLE LOGIC 
 # ------------------------------------------------------------------
 
-def text_content_bbox(page, pad=5):
-    words = page.extract_words(x_tolerance=2, y_tolerance=2)
+def text_content_bbox(page, pad=5, analysis=None):
+    analysis = analysis or PageAnalysis(page)
+    words = analysis.words(x_tolerance=2, y_tolerance=2)
     if not words:
         return None
     x0 = min(w['x0'] for w in words) - pad
@@ -170,12 +428,18 @@ def text_content_bbox(page, pad=5):
 
 
 def group_rows(words, y_tol=3):
+    """
+    Cluster words into rows. A row is anchored on the top of its first word
+    and takes every later word within y_tol of that anchor.
+
+    Words are visited in top order and each new anchor lies more than y_tol
+    below the previous one, so only the last row can ever match: one sweep
+    after the sort gives the same rows as comparing against all of them.
+    """
     rows = []
     for w in sorted(words, key=lambda d: d['top']):
-        for r in rows:
-            if abs(w['top'] - r['top']) <= y_tol:
-                r['words'].append(w)
-                break
+        if rows and abs(w['top'] - rows[-1]['top']) <= y_tol:
+            rows[-1]['words'].append(w)
         else:
             rows.append({'top': w['top'], 'words': [w]})
     for r in rows:
@@ -212,6 +476,50 @@ def cluster_centers(xs, min_gap=45):
     return [sum(c) / len(c) for c in clusters]
 
 
+# ------------------------------------------------------------------
+# NumPy-backed borderless helpers (same results as the loops above)
+# ------------------------------------------------------------------
+# Every spelling whose .lower() is 'nan' (only ASCII N/A lowercase to n/a).
+_NAN_SPELLINGS = ["".join(p) for p in product("nN", "aA", "nN")]
+
+
+def nearest_center_idx(xs, centers):
+    """
+    Index of the nearest center for each x, ties going to the lower index
+    as min(range(len(centers)), key=...) does. centers must be increasing
+    and have at least two entries: the nearest is then one of the pair
+    bracketing x, found by searchsorted and compared exactly.
+    """
+    xs = np.asarray(xs, dtype=float)
+    c = np.asarray(centers, dtype=float)
+    hi = np.clip(np.searchsorted(c, xs), 1, len(c) - 1)
+    lo = hi - 1
+    return np.where(np.abs(xs - c[lo]) <= np.abs(xs - c[hi]), lo, hi)
+
+
+def split_rows_into_cells(rows, gap=25):
+    """[split_row_into_cells(r['words'], gap) for r in rows], with the gaps
+    computed for the whole page at once."""
+    words = [w for r in rows for w in r['words']]
+    if not words:
+        return [[] for _ in rows]
+    row_id = np.repeat(np.arange(len(rows)), [len(r['words']) for r in rows])
+    x0 = np.fromiter((w['x0'] for w in words), float, len(words))
+    x1 = np.fromiter((w['x1'] for w in words), float, len(words))
+    breaks = (row_id[1:] != row_id[:-1]) | (x0[1:] - x1[:-1] > gap)
+    bounds = np.concatenate(([0], np.flatnonzero(breaks) + 1, [len(words)]))
+
+    out = [[] for _ in rows]
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        out[row_id[a]].append(words[a:b])
+    return out
+
+
+def nonempty_cell_mask(values):
+    """values != '' and value.lower() != 'nan', over a 2-D object array."""
+    return (values != '') & ~np.isin(values, _NAN_SPELLINGS)
+
+
 def _is_noise_header_footer(line: str) -> bool:
     """Filter recurring page header/footer noise."""
     if not line:
@@ -222,7 +530,8 @@ def _is_noise_header_footer(line: str) -> bool:
 
 def extract_title_lines_above(page, x0, x1, bottom_y,
                              max_up=180, y_tol=3,
-                             line_gap=45, first_line_gap=70, max_lines=4):
+                             line_gap=45, first_line_gap=70, max_lines=4,
+                             analysis=None):
     """    Extract title lines immediately above a borderless table.
 
     We crop a band above the table/header and take the closest title block
@@ -244,8 +553,8 @@ def extract_title_lines_above(page, x0, x1, bottom_y,
     bottom_y_adj = max(0, bottom_y - 0.5)
     top_y = max(0, bottom_y_adj - max_up)
 
-    region = page.crop((x0, top_y, x1, bottom_y_adj))
-    words = region.extract_words(x_tolerance=2, y_tolerance=2)
+    analysis = analysis or PageAnalysis(page)
+    words = analysis.words((x0, top_y, x1, bottom_y_adj), x_tolerance=2, y_tolerance=2)
     if not words:
         return []
 
@@ -316,10 +625,15 @@ def prepend_title_rows(df: pd.DataFrame, title_lines, header_row=None):
 
     out_frames.append(df)
     return pd.concat(out_frames, ignore_index=True)
-def extract_borderless_from_bbox(page, bbox):
+def extract_borderless_from_bbox(page, bbox, analysis=None, vectorized=True):
+    """
+    vectorized=True assigns words to columns with nearest_center_idx and
+    computes the cell masks as arrays; vectorized=False runs the original
+    per-word loops (kept for benchmarking). Both give the same table.
+    """
     x0, top, x1, bottom = bbox
-    cropped = page.crop((x0, top, x1, bottom))
-    words = cropped.extract_words(x_tolerance=2, y_tolerance=2)
+    analysis = analysis or PageAnalysis(page)
+    words = analysis.words((x0, top, x1, bottom), x_tolerance=2, y_tolerance=2)
     H = page.height
     words = [w for w in words if w['top'] > 50 and w['bottom'] < H - 50]
     if len(words) < 8:
@@ -327,9 +641,13 @@ def extract_borderless_from_bbox(page, bbox):
 
     rows = group_rows(words, y_tol=3)
 
+    if vectorized:
+        split_cells = split_rows_into_cells(rows, gap=25)
+    else:
+        split_cells = [split_row_into_cells(r['words'], gap=25) for r in rows]
+
     row_cells = []
-    for r in rows:
-        cells = split_row_into_cells(r['words'], gap=25)
+    for r, cells in zip(rows, split_cells):
         cell_text = [' '.join(w['text'] for w in c).strip() for c in cells]
         row_cells.append({'top': r['top'], 'cells': cell_text, 'cell_words': cells})
 
@@ -351,18 +669,37 @@ def extract_borderless_from_bbox(page, bbox):
 
     matrix = []
     tops = []
-    for r in rows:
-        buckets = defaultdict(list)
-        for w in r['words']:
-            buckets[col_idx(w)].append(w)
-        row = [''] * len(centers)
-        for i in range(len(centers)):
-            ws = sorted(buckets.get(i, []), key=lambda d: d['x0'])
-            if ws:
-                row[i] = ' '.join(w['text'] for w in ws).strip()
-        if any(c.strip() for c in row):
-            matrix.append(row)
-            tops.append(r['top'])
+    if vectorized:
+        # Row words are sorted by x0 and the nearest center is monotone in
+        # x0, so each column's words form one contiguous run.
+        flat_x0 = [w['x0'] for r in rows for w in r['words']]
+        cidx = nearest_center_idx(flat_x0, centers).tolist() if flat_x0 else []
+        pos = 0
+        for r in rows:
+            n = len(r['words'])
+            row = [''] * len(centers)
+            start = 0
+            for k in range(1, n + 1):
+                if k == n or cidx[pos + k] != cidx[pos + start]:
+                    row[cidx[pos + start]] = ' '.join(w['text'] for w in r['words'][start:k]).strip()
+                    start = k
+            pos += n
+            if any(c.strip() for c in row):
+                matrix.append(row)
+                tops.append(r['top'])
+    else:
+        for r in rows:
+            buckets = defaultdict(list)
+            for w in r['words']:
+                buckets[col_idx(w)].append(w)
+            row = [''] * len(centers)
+            for i in range(len(centers)):
+                ws = sorted(buckets.get(i, []), key=lambda d: d['x0'])
+                if ws:
+                    row[i] = ' '.join(w['text'] for w in ws).strip()
+            if any(c.strip() for c in row):
+                matrix.append(row)
+                tops.append(r['top'])
 
     body_tops = [rc['top'] for rc in body]
     first_data_top = min(body_tops) if body_tops else None
@@ -397,16 +734,26 @@ def extract_borderless_from_bbox(page, bbox):
 
     # Extract table title lines from the band immediately above the table/header
     title_bottom = header_top if header_top is not None else first_data_top
-    title_lines = extract_title_lines_above(page, x0, x1, title_bottom)
+    title_lines = extract_title_lines_above(page, x0, x1, title_bottom, analysis=analysis)
 
     # Keep simple column names for borderless output. When title lines exist we will
     # write CSV with header=False, and include the detected header row as a row.
     cols = make_unique([f'Column{i+1}' for i in range(len(sub[0]))])
-    df = pd.DataFrame(sub, columns=cols)
-    df = df.apply(lambda col: col.astype(str).str.strip())
-
-    df, _ = drop_sparse_columns_by_index(df, empty_thresh=0.9, data_only=False)
-    df = df[df.apply(lambda r: sum(v != '' and v.lower() != 'nan' for v in r) >= 2, axis=1)].reset_index(drop=True)
+    if vectorized:
+        # Cells are already stripped strings, so the strip pass is a no-op.
+        values = np.array(sub, dtype=object)
+        keep_cols = np.flatnonzero((values == '').mean(axis=0) < 0.9)
+        if len(keep_cols) == 0:
+            keep_cols = np.arange(values.shape[1])
+        values = values[:, keep_cols]
+        values = values[nonempty_cell_mask(values).sum(axis=1) >= 2]
+        df = pd.DataFrame(values.tolist(), columns=[cols[i] for i in keep_cols])
+    else:
+        df = pd.DataFrame(sub, columns=cols)
+        df = df.apply(lambda col: col.astype(str).str.strip())
+
+        df, _ = drop_sparse_columns_by_index(df, empty_thresh=0.9, data_only=False)
+        df = df[df.apply(lambda r: sum(v != '' and v.lower() != 'nan' for v in r) >= 2, axis=1)].reset_index(drop=True)
     if df.shape[0] < 1 or df.shape[1] < 2:
         return None
 
@@ -424,76 +771,739 @@ def extract_borderless_from_bbox(page, bbox):
 # ------------------------------------------------------------------
 # Main extraction
 # -------
-def extract_pdf(pdf_path: Path, out_dir: Path):
-    out_dir.mkdir(exist_ok=True)
+def analyze_page(page, timings=None):
+    """
+    Detect and extract the single table on a page.
+
+    Returns ("bordered", (grid, meta)), ("borderless", (df, meta)) or None,
+    where a bordered meta holds the table bbox. This is
+    the per-page map step; stitching across pages happens in write_tables.
+    Stage times are added to `timings` (a StageTimings) when given.
+    """
+    analysis = PageAnalysis(page, timings)
+    timings = analysis.timings
+
+    # Parse the page's objects up front so find_tables times are detection only.
+    with timings.stage("parse"):
+        page.objects
+
+    tables = analysis.find_tables(LINES_TABLE_SETTINGS)
+
+    # Prefer bordered if it exists
+    if tables:
+        timings.annotate(path="bordered")
+        with timings.stage("extract:bordered"):
+            grid = extract_bordered_table(page, tables[0], analysis=analysis)
+        timings.annotate(n_rows=len(grid), n_cols=len(grid[0]) if grid else 0)
+        return "bordered", (grid, {'bbox': tuple(float(v) for v in tables[0].bbox)})
+
+    page_tables = analysis.find_tables(TEXT_TABLE_SETTINGS)
+
+    res = None
+    if page_tables:
+        # normal case: bbox found
+        timings.annotate(path="borderless")
+        with timings.stage("extract:borderless"):
+            res = extract_borderless_from_bbox(page, page_tables[0].bbox, analysis=analysis)
+    else:
+        timings.annotate(path="tight_bbox")
+        with timings.stage("extract:tight_bbox"):
+            tight_bbox = text_content_bbox(page, analysis=analysis)
+            if tight_bbox:
+                res = extract_borderless_from_bbox(page, tight_bbox, analysis=analysis)
+
+    if res is None:
+        timings.annotate(n_rows=0, n_cols=0)
+        return None
+    timings.annotate(n_rows=int(res[0].shape[0]), n_cols=int(res[0].shape[1]))
+    return "borderless", res
+
+
+# ------------------------------------------------------------------
+# Streaming output (stitching as events, incremental sinks)
+# ------------------------------------------------------------------
+TableChunk = namedtuple("TableChunk", ["table_key", "page_no", "df", "meta"])
+TableChunk.__doc__ = """Rows of one table found on one page.
+
+table_key is the table's 1-based ordinal in the document, as in its output
+file name, and is shared by every chunk of a stitched table; meta is the borderless meta dict, or for bordered pages
+{'kind': 'bordered', 'bbox': ..., 'has_header': ..., 'continued': ...}."""
+
+TableDone = namedtuple("TableDone", ["table_key", "name"])
+TableDone.__doc__ = """No more chunks for table_key; name is its output file stem."""
+
+
+def iter_table_events(pdf_path: Path, page_results, timings=None):
+    """
+    Stitch (page_no, analyze_page result) pairs into TableChunk / TableDone
+    events. Only the open table's columns are kept between pages, so memory
+    is bounded by one page. Each table takes the next ordinal when it opens,
+    so ordinals are unique and follow the tables' start pages.
+    """
+    timings = timings if timings is not None else StageTimings()
+    stem = Path(pdf_path).stem
     table_idx = 0
-    current_df = None
+    open_idx = None
     current_columns = None
     current_start_page = None
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_no, page in enumerate(pdf.pages, start=1):
-
-            tables = page.find_tables(
-                table_settings={
-                    "vertical_strategy": "lines",
-                    "horizontal_strategy": "lines",
-                    "snap_tolerance": 3,
-                    "join_tolerance": 3,
-                }
-            )
-
-            # Prefer bordered if it exists
-            if tables:
-                grid = extract_bordered_table(page, tables[0])
-                has_header = looks_like_header_row(grid[0])
-
-                if has_header:
-                    if current_df is not None:
-                        fname = f"{pdf_path.stem}_{table_idx:03d}_page{current_start_page}.csv"
-                        current_df.to_csv(out_dir / fname, index=False)
-                    table_idx += 1
-                    current_start_page = page_no
-                    current_columns = grid[0]
-                    current_df = pd.DataFrame(grid[1:], columns=current_columns)
-                else:
-                    df_append = pd.DataFrame(grid, columns=current_columns or [f"Column{i+1}" for i in range(len(grid[0]))])
-                    current_df = pd.concat([current_df, df_append], ignore_index=True) if current_df is not None else df_append
+    for page_no, result in page_results:
+        if result is None:
+            continue
+        kind, payload = result
+
+        if kind == "bordered":
+            grid, page_meta = payload
+            has_header = looks_like_header_row(grid[0])
+
+            if has_header:
+                if open_idx is not None:
+                    yield TableDone(open_idx, f"{stem}_{open_idx:03d}_page{current_start_page}")
+                current_columns = grid[0]
+                with timings.stage("dataframe"):
+                    df = pd.DataFrame(grid[1:], columns=current_columns)
             else:
-                page_tables = page.find_tables(
-                    table_settings={
-                        'vertical_strategy': 'text',
-                        'horizontal_strategy': 'text',
-                        'snap_tolerance': 3,
-                        'join_tolerance': 3,
-                        'intersection_tolerance': 3,
-                        'edge_min_length': 3,
-                        'min_words_vertical': 1,
-                        'min_words_horizontal': 1,
-                    }
-                )
-
-                res = None
-                if page_tables:
-                    # normal case: bbox found
-                    res = extract_borderless_from_bbox(page, page_tables[0].bbox)
+                with timings.stage("dataframe"):
+                    df = pd.DataFrame(grid, columns=current_columns or [f"Column{i+1}" for i in range(len(grid[0]))])
+            if has_header or open_idx is None:
+                table_idx += 1
+                open_idx = table_idx
+                current_start_page = page_no
+            meta = {'kind': 'bordered', 'bbox': page_meta['bbox'],
+                    'has_header': has_header, 'continued': not has_header}
+            yield TableChunk(open_idx, page_no, df, meta)
+        else:
+            df, meta = payload
+            title_lines = meta.get('title_lines') if isinstance(meta, dict) else None
+            header_row = meta.get('header_row') if isinstance(meta, dict) else None
+            with timings.stage("dataframe"):
+                df = prepend_title_rows(df, title_lines, header_row)
+            table_idx += 1
+            yield TableChunk(table_idx, page_no, df, meta)
+            yield TableDone(table_idx, f"{stem}_{table_idx:03d}_page{page_no}")
+
+    if open_idx is not None:
+        yield TableDone(open_idx, f"{stem}_{open_idx:03d}_page{current_start_page}")
+
+
+def iter_tables(pdf_path: Path, page_results=None, timings=None):
+    """
+    Generator API: yield TableChunk / TableDone events as pages are parsed.
+
+    >>> for ev in iter_tables(Path("doc.pdf")):
+    ...     if isinstance(ev, TableChunk):
+    ...         handle(ev.table_key, ev.df)
+    """
+    if page_results is None:
+        page_results = iter_page_results(pdf_path, timings=timings)
+    yield from iter_table_events(pdf_path, page_results, timings)
+
+
+def _stitched_columns(columns, df):
+    # Column order pd.concat([current, df]) would produce (outer join by name).
+    return columns + [c for c in df.columns if c not in columns]
+
+
+class CsvSink:
+    """
+    Append each chunk to a part file and rename it on TableDone. Output is
+    byte-identical to concatenating the chunks and calling to_csv once.
+    """
+
+    suffix = ".csv"
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self.parts = {}
+        self.columns = {}
+
+    def _part(self, key):
+        return self.out_dir / f".table{key}{self.suffix}.part"
+
+    def append(self, key, df):
+        part = self._part(key)
+        if key not in self.parts:
+            self.parts[key] = part
+            self.columns[key] = list(df.columns)
+            df.to_csv(part, index=False)
+            return
+
+        columns = self.columns[key]
+        if list(df.columns) != columns:
+            wider = _stitched_columns(columns, df)
+            if wider != columns:
+                self._widen(part, wider, len(wider) - len(columns))
+                self.columns[key] = columns = wider
+            df = df.reindex(columns=columns)
+        df.to_csv(part, index=False, header=False, mode="a")
+
+    def _widen(self, part, columns, extra):
+        # Rare: a headerless page wider than the table so far. Rewrite the
+        # part file with blank trailing fields, as pd.concat would have.
+        tmp = part.with_name(part.name + ".tmp")
+        pd.DataFrame(columns=columns).to_csv(tmp, index=False)
+        with open(part, newline="", encoding="utf-8") as src, \
+                open(tmp, "a", newline="", encoding="utf-8") as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst, lineterminator=os.linesep)
+            next(reader)
+            for row in reader:
+                writer.writerow(row + [""] * extra)
+        os.replace(tmp, part)
+
+    def close(self, key, name):
+        os.replace(self.parts.pop(key), self.out_dir / f"{name}{self.suffix}")
+        del self.columns[key]
+
+    def abort(self):
+        for part in self.parts.values():
+            part.unlink(missing_ok=True)
+        self.parts.clear()
+        self.columns.clear()
+
+
+class JsonlSink(CsvSink):
+    """One JSON object per row, keyed by (de-duplicated) column name."""
+
+    suffix = ".jsonl"
+
+    def append(self, key, df):
+        part = self.parts.setdefault(key, self._part(key))
+        self.columns.setdefault(key, None)
+        df = df.set_axis(make_unique(df.columns), axis=1)
+        df.to_json(part, orient="records", lines=True, force_ascii=False, mode="a")
+
+
+def _import_pyarrow(fmt):
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(f"{fmt} output requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+class _ColumnarWriter:
+    """Append-only Parquet or Arrow IPC file writer with a fixed schema."""
+
+    def __init__(self, pa, fmt, path, schema):
+        self.pa = pa
+        self.fmt = fmt
+        if fmt == "parquet":
+            self.file = None
+            self.writer = pa.parquet.ParquetWriter(path, schema)
+        else:
+            self.file = pa.OSFile(str(path), "wb")
+            self.writer = pa.ipc.new_file(self.file, schema)
+
+    def write(self, table):
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+        if self.file is not None:
+            self.file.close()
+
+
+def _read_columnar(pa, fmt, path):
+    if fmt == "parquet":
+        return pa.parquet.read_table(path)
+    with pa.OSFile(str(path), "rb") as f:
+        return pa.ipc.open_file(f).read_all()
+
+
+class ParquetSink(CsvSink):
+    """
+    One Parquet file per table, one row group per chunk. Cells are kept as
+    the extracted strings (blank padding cells are null); duplicate column
+    names are made unique.
+    """
+
+    suffix = ".parquet"
+    fmt = "parquet"
+
+    def __init__(self, out_dir: Path):
+        self.pa = _import_pyarrow(self.fmt)
+        super().__init__(out_dir)
+        self.writers = {}
+
+    def _table(self, df, columns):
+        df = df.set_axis(make_unique(df.columns), axis=1).reindex(columns=columns)
+        schema = self.pa.schema([(c, self.pa.string()) for c in columns])
+        return self.pa.Table.from_pandas(df.astype(object).where(df.notna(), None),
+                                         schema=schema, preserve_index=False)
+
+    def append(self, key, df):
+        unique = make_unique(df.columns)
+        if key not in self.writers:
+            part = self.parts[key] = self._part(key)
+            self.columns[key] = unique
+            table = self._table(df, unique)
+            self.writers[key] = _ColumnarWriter(self.pa, self.fmt, part, table.schema)
+            self.writers[key].write(table)
+            return
+
+        columns = self.columns[key]
+        wider = columns + [c for c in unique if c not in columns]
+        if wider != columns:
+            # Rare: re-open the part file with the wider schema.
+            self.writers[key].close()
+            old = _read_columnar(self.pa, self.fmt, self.parts[key])
+            for c in wider[len(columns):]:
+                old = old.append_column(c, self.pa.nulls(old.num_rows, self.pa.string()))
+            self.writers[key] = _ColumnarWriter(self.pa, self.fmt, self.parts[key], old.schema)
+            self.writers[key].write(old)
+            self.columns[key] = columns = wider
+        self.writers[key].write(self._table(df, columns))
+
+    def close(self, key, name):
+        self.writers.pop(key).close()
+        super().close(key, name)
+
+    def abort(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
+        super().abort()
+
+
+class ArrowSink(ParquetSink):
+    """Same as ParquetSink, written as Arrow IPC files (.arrow)."""
+
+    suffix = ".arrow"
+    fmt = "arrow"
+
+
+SINKS = {"csv": CsvSink, "jsonl": JsonlSink, "parquet": ParquetSink, "arrow": ArrowSink}
+
+
+_AMOUNT = r"\(?[-+]?[£$€]?\s*[-+]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?\)?"
+_DATE_FORMATS = ((r"\d{1,2}/\d{1,2}/\d{4}", "%d/%m/%Y"), (r"\d{1,2}/\d{1,2}/\d{2}", "%d/%m/%y"),
+                 (r"\d{4}-\d{2}-\d{2}", "%Y-%m-%d"))
+
+
+def _flat_cells(rows):
+    flat = pd.Series([c for r in rows for c in r], dtype="string").fillna("").str.strip()
+    return flat, [len(r) for r in rows]
+
+
+def _unflatten(values, lengths):
+    out, i = [], 0
+    for n in lengths:
+        out.append(values[i:i + n])
+        i += n
+    return out
+
+
+def parse_amounts(rows):
+    """
+    Each cell of rows (lists of strings) as a float where it is a number or
+    money amount (currency symbol, thousands separators, parenthesised
+    negative), else NaN. Parsed once here so loaders don't re-infer types.
+    """
+    flat, lengths = _flat_cells(rows)
+    is_amount = flat.str.fullmatch(_AMOUNT)
+    values = pd.to_numeric(flat.where(is_amount).str.replace(r"[£$€,\s()+]", "", regex=True), errors="coerce")
+    negative = flat.str.startswith("(") & flat.str.endswith(")")
+    values = values.where(~negative, -values)
+    return _unflatten(values.to_numpy(dtype=float, na_value=np.nan).tolist(), lengths)
+
+
+def parse_dates(rows):
+    """Each cell of rows as a datetime.date where it is a day-first or ISO date, else NaN."""
+    flat, lengths = _flat_cells(rows)
+    dates = pd.Series(pd.NaT, index=flat.index, dtype="datetime64[ns]")
+    for pattern, fmt in _DATE_FORMATS:
+        hit = flat.str.fullmatch(pattern).fillna(False) & dates.isna()
+        if hit.any():
+            dates[hit] = pd.to_datetime(flat[hit], format=fmt, errors="coerce")
+    values = [d.date() if not pd.isna(d) else np.nan for d in dates]
+    return _unflatten(values, lengths)
+
+
+def _nulls_for_nan(rows):
+    return [[None if isinstance(v, float) and v != v else v for v in r] for r in rows]
+
+
+class DocumentSink:
+    """
+    Every table of one document in a single Parquet / Arrow file, one record
+    per table row, so a corpus loads with one columnar read:
+
+        table_idx    the table's ordinal, as in its per-table file name
+                     (<stem>_<table_idx:03d>_page<n>); unique per table,
+                     shared by the pages of a stitched one
+        page_no      page the row was found on
+        row_idx      row number within the table
+        bbox         table bbox on that page
+        has_header   header row detected when the table started
+        title_lines  title block above a borderless table
+        columns      the table's column names
+        cells        the row's cell strings
+        numbers      each cell parsed as an amount (parse_amounts), else null
+        dates        each cell parsed as a day-first date (parse_dates), else null
+
+    Rows are written as their chunks arrive, in page order. The file's schema
+    metadata records the source PDF and EXTRACTOR_VERSION.
+    """
+
+    def __init__(self, out_dir: Path, pdf_path: Path, fmt="parquet"):
+        self.pa = pa = _import_pyarrow(fmt)
+        self.fmt = fmt
+        self.path = out_dir / f"{Path(pdf_path).stem}_tables.{fmt}"
+        self.part = self.path.with_name(f".{self.path.name}.part")
+        self.schema = pa.schema(
+            [
+                ("table_idx", pa.int32()),
+                ("page_no", pa.int32()),
+                ("row_idx", pa.int32()),
+                ("bbox", pa.list_(pa.float64(), 4)),
+                ("has_header", pa.bool_()),
+                ("title_lines", pa.list_(pa.string())),
+                ("columns", pa.list_(pa.string())),
+                ("cells", pa.list_(pa.string())),
+                ("numbers", pa.list_(pa.float64())),
+                ("dates", pa.list_(pa.date32())),
+            ],
+            metadata={"source": Path(pdf_path).name, "extractor_version": EXTRACTOR_VERSION},
+        )
+        self.writer = _ColumnarWriter(pa, fmt, self.part, self.schema)
+        self.rows = {}
+        self.has_header = {}
+
+    def append(self, key, page_no, df, meta):
+        meta = meta if isinstance(meta, dict) else {}
+        start = self.rows.get(key, 0)
+        self.rows[key] = start + len(df)
+        has_header = self.has_header.setdefault(key, bool(meta.get('has_header')))
+        if df.empty:
+            return
+
+        n = len(df)
+        columns = [str(c) for c in df.columns]
+        cells = df.astype(object).where(df.notna(), None).values.tolist()
+        bbox = meta.get('bbox')
+        self.writer.write(self.pa.table(
+            {
+                "table_idx": [key] * n,
+                "page_no": [page_no] * n,
+                "row_idx": list(range(start, start + n)),
+                "bbox": [list(bbox) if bbox else None] * n,
+                "has_header": [has_header] * n,
+                "title_lines": [meta.get('title_lines') or []] * n,
+                "columns": [columns] * n,
+                "cells": cells,
+                "numbers": _nulls_for_nan(parse_amounts(cells)),
+                "dates": _nulls_for_nan(parse_dates(cells)),
+            },
+            schema=self.schema,
+        ))
+
+    def close(self):
+        self.writer.close()
+        os.replace(self.part, self.path)
+
+    def abort(self):
+        self.writer.close()
+        self.part.unlink(missing_ok=True)
+
+
+def write_tables(pdf_path: Path, out_dir: Path, page_results, fmt="csv", document_fmt=None, timings=None):
+    """
+    Reduce step: consume (page_no, analyze_page result) in page order,
+    stitch headerless bordered tables onto the previous one and stream each
+    chunk to the sink for `fmt` (csv, jsonl, parquet or arrow). With
+    document_fmt ("parquet" or "arrow") all tables are also written to one
+    consolidated DocumentSink file.
+    """
+    timings = timings if timings is not None else StageTimings()
+    out_dir.mkdir(exist_ok=True)
+    sink = SINKS[fmt](out_dir)
+    doc = DocumentSink(out_dir, pdf_path, document_fmt) if document_fmt else None
+    try:
+        for event in iter_tables(pdf_path, page_results, timings):
+            with timings.stage("write"):
+                if isinstance(event, TableChunk):
+                    sink.append(event.table_key, event.df)
+                    if doc is not None:
+                        doc.append(event.table_key, event.page_no, event.df, event.meta)
                 else:
-                    tight_bbox = text_content_bbox(page)
-                    if tight_bbox:
-                        res = extract_borderless_from_bbox(page, tight_bbox)
+                    sink.close(event.table_key, event.name)
+        if doc is not None:
+            with timings.stage("write"):
+                doc.close()
+    except BaseException:
+        sink.abort()
+        if doc is not None:
+            doc.abort()
+        raise
+
+
+# ------------------------------------------------------------------
+# Extraction cache (content-hash keyed, size-bounded LRU on disk)
+# ------------------------------------------------------------------
+# Bump whenever a change to the extraction logic changes analyze_page output.
+EXTRACTOR_VERSION = "2"
+# Bump whenever the layout of a cache entry changes.
+CACHE_FORMAT_VERSION = "1"
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("EXTRACT_PDF_CACHE", Path.home() / ".cache" / "extract_pdf_tables"))
+
 
-                if res is not None:
-                    df, meta = res
-                    title_lines = meta.get('title_lines') if isinstance(meta, dict) else None
-                    header_row = meta.get('header_row') if isinstance(meta, dict) else None
-                    df = prepend_title_rows(df, title_lines, header_row)
-                    table_idx += 1
-                    fname = f"{pdf_path.stem}_{table_idx:03d}_page{page_no}.csv"
-                    df.to_csv(out_dir / fname, index=False)
+def pdf_digest(pdf_path: Path):
+    h = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
 
-    if current_df is not None:
-        fname = f"{pdf_path.stem}_{table_idx:03d}_page{current_start_page}.csv"
-        current_df.to_csv(out_dir / fname, index=False)
+
+class ExtractionCache:
+    """
+    On-disk cache of analyze_page results.
+
+    Entries are keyed by sha256(PDF bytes), page number, EXTRACTOR_VERSION,
+    CACHE_FORMAT_VERSION, the pandas and numpy versions (results hold
+    pickled DataFrames) and both table_settings dicts, one pickle file each.
+    An entry that fails to load for any reason is treated as a miss. Reads refresh the
+    file's mtime, and evict() deletes least recently used entries until the
+    cache fits in max_bytes. A document's page count is cached too, so a
+    fully cached re-submission is never opened with pdfplumber.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, max_bytes=512 * 1024 ** 2):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        settings = json.dumps([LINES_TABLE_SETTINGS, TEXT_TABLE_SETTINGS], sort_keys=True)
+        versions = f"{EXTRACTOR_VERSION}|{CACHE_FORMAT_VERSION}|pandas {pd.__version__}|numpy {np.__version__}"
+        self.namespace = hashlib.sha256(f"{versions}|{settings}".encode()).hexdigest()[:16]
+
+    def _file(self, digest, item):
+        key = hashlib.sha256(f"{self.namespace}|{digest}|{item}".encode()).hexdigest()
+        return self.path / key[:2] / f"{key}.pkl"
+
+    def _get(self, digest, item):
+        f = self._file(digest, item)
+        try:
+            with open(f, "rb") as fh:
+                value = pickle.load(fh)
+            os.utime(f)
+        except Exception:
+            # Missing, truncated, or written by other library versions
+            # (AttributeError, ImportError, TypeError...): re-extract.
+            return False, None
+        return True, value
+
+    def _put(self, digest, item, value):
+        f = self._file(digest, item)
+        f.parent.mkdir(parents=True, exist_ok=True)
+        tmp = f.with_name(f"{f.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, f)
+
+    def get_page(self, digest, page_no):
+        """Return (hit, analyze_page result)."""
+        return self._get(digest, f"page{page_no}")
+
+    def put_page(self, digest, page_no, result):
+        self._put(digest, f"page{page_no}", result)
+
+    def page_count(self, digest):
+        return self._get(digest, "n_pages")[1]
+
+    def put_page_count(self, digest, n_pages):
+        self._put(digest, "n_pages", n_pages)
+
+    def evict(self):
+        entries = []
+        for f in self.path.glob("*/*.pkl"):
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        total = sum(size for _, size, _ in entries)
+        for _, size, f in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+
+
+def iter_page_results(pdf_path: Path, page_nos=None, timings=None, cache=None, digest=None):
+    """
+    Yield (page_no, analyze_page result) for each page. With a cache, pages
+    already extracted from identical PDF bytes are served from it and the
+    PDF is only opened when some page misses.
+    """
+    timings = timings if timings is not None else StageTimings()
+    pdf = None
+    try:
+        if cache is not None:
+            with timings.stage("cache:lookup"):
+                digest = digest or pdf_digest(pdf_path)
+                if page_nos is None:
+                    n_pages = cache.page_count(digest)
+                    if n_pages is not None:
+                        page_nos = range(1, n_pages + 1)
+
+        if page_nos is None:
+            with timings.stage("open"):
+                pdf = pdfplumber.open(pdf_path)
+            page_nos = range(1, len(pdf.pages) + 1)
+            if cache is not None:
+                cache.put_page_count(digest, len(pdf.pages))
+
+        for page_no in page_nos:
+            if cache is not None:
+                with timings.stage("cache:lookup"):
+                    hit, result = cache.get_page(digest, page_no)
+                timings.count("cache:hit" if hit else "cache:miss")
+                if hit:
+                    with timings.page(pdf_path, page_no):
+                        timings.annotate(path="cache")
+                    yield page_no, result
+                    continue
+            if pdf is None:
+                with timings.stage("open"):
+                    pdf = pdfplumber.open(pdf_path)
+            with timings.page(pdf_path, page_no):
+                result = analyze_page(pdf.pages[page_no - 1], timings)
+            if cache is not None:
+                cache.put_page(digest, page_no, result)
+            yield page_no, result
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+
+def extract_pdf(pdf_path: Path, out_dir: Path, timings=None, cache=None, fmt="csv", document_fmt=None):
+    write_tables(pdf_path, out_dir, iter_page_results(pdf_path, timings=timings, cache=cache),
+                 fmt=fmt, document_fmt=document_fmt, timings=timings)
+
+
+# ------------------------------------------------------------------
+# Parallel engine (pages and files fanned out over a process pool)
+# ------------------------------------------------------------------
+def _analyze_chunk(pdf_path, page_nos, cache=None, digest=None, trace=False):
+    # Runs in a worker: every chunk opens its own pdfplumber handle.
+    timings = Tracer() if trace else StageTimings()
+    return list(iter_page_results(pdf_path, page_nos, timings, cache, digest)), timings
+
+
+def extract_pdfs(pdf_paths, out_dir: Path, workers=None, chunk_size=4, timings=None, cache=None,
+                 fmt="csv", document_fmt=None):
+    """
+    Extract many PDFs, analysing pages in a process pool.
+
+    Pages are split into chunks of chunk_size per file. Results are reduced
+    per file in page order by write_tables, so the CSVs match a serial
+    extract_pdf run exactly. workers=1 runs everything in-process. Worker
+    stage timings are merged into `timings` when given. With an
+    ExtractionCache, cached pages are skipped and the cache is trimmed to
+    its size bound at the end. fmt and document_fmt are as for write_tables.
+
+    A PDF that fails is reported and skipped; the rest are still extracted.
+    Returns {path: "ErrorType: message"} for the failures. Raises ValueError
+    up front if two different PDFs share a stem, as their outputs would
+    overwrite each other.
+    """
+    pdf_paths = list({Path(p).resolve(): Path(p) for p in pdf_paths}.values())
+    _check_unique_stems(pdf_paths)
+    failures = {}
+    try:
+        if workers == 1:
+            for pdf_path in pdf_paths:
+                with _file_failures(pdf_path, failures):
+                    extract_pdf(pdf_path, out_dir, timings, cache, fmt, document_fmt)
+        else:
+            _extract_pdfs_parallel(pdf_paths, out_dir, workers, chunk_size, timings, cache,
+                                   fmt, document_fmt, failures)
+    finally:
+        if cache is not None:
+            cache.evict()
+    return failures
+
+
+def _check_unique_stems(pdf_paths):
+    by_stem = defaultdict(list)
+    for p in pdf_paths:
+        by_stem[p.stem].append(str(p))
+    clashes = {stem: paths for stem, paths in by_stem.items() if len(paths) > 1}
+    if clashes:
+        listed = "; ".join(", ".join(paths) for paths in clashes.values())
+        raise ValueError(f"PDFs with the same file name would overwrite each other's output: {listed}")
+
+
+@contextmanager
+def _file_failures(pdf_path, failures):
+    # One broken PDF must not end a batch: record it and carry on with the next.
+    try:
+        yield
+    except Exception as e:
+        failures[str(pdf_path)] = f"{type(e).__name__}: {e}"
+        print(f"FAILED {pdf_path}: {failures[str(pdf_path)]}", file=sys.stderr)
+
+
+def _extract_pdfs_parallel(pdf_paths, out_dir, workers, chunk_size, timings, cache, fmt, document_fmt,
+                           failures):
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = []
+    for pdf_path in pdf_paths:
+        digest = n_pages = None
+        with _file_failures(pdf_path, failures):
+            if cache is not None:
+                digest = pdf_digest(pdf_path)
+                n_pages = cache.page_count(digest)
+            if n_pages is None:
+                with pdfplumber.open(pdf_path) as pdf:
+                    n_pages = len(pdf.pages)
+                if cache is not None:
+                    cache.put_page_count(digest, n_pages)
+        if n_pages is None:
+            continue
+        for start in range(1, n_pages + 1, chunk_size):
+            jobs.append((pdf_path, list(range(start, min(start + chunk_size, n_pages + 1))), digest))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        trace = isinstance(timings, Tracer)
+        futures = [pool.submit(_analyze_chunk, p, nos, cache, digest, trace) for p, nos, digest in jobs]
+
+        def results_for(pdf_path):
+            for (p, _, _), fut in zip(jobs, futures):
+                if p == pdf_path:
+                    results, chunk_timings = fut.result()
+                    if timings is not None:
+                        timings.merge(chunk_timings)
+                    yield from results
+
+        for pdf_path in pdf_paths:
+            if str(pdf_path) in failures:
+                continue
+            # A chunk's exception surfaces from fut.result() inside write_tables,
+            # which aborts this file's part files before it is recorded here.
+            with _file_failures(pdf_path, failures):
+                write_tables(pdf_path, out_dir, results_for(pdf_path), fmt=fmt, document_fmt=document_fmt,
+                             timings=timings)
+
+
+def expand_pdf_inputs(inputs):
+    """Resolve CLI inputs (files, directories, glob patterns) to PDF paths."""
+    from glob import glob
+
+    paths = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            paths.extend(sorted(p.glob("*.pdf")))
+        elif any(ch in item for ch in "*?["):
+            paths.extend(Path(m) for m in sorted(glob(item)))
+        else:
+            paths.append(p)
+    return paths
 
 
 # ------------------------------------------------------------------
@@ -501,9 +1511,37 @@ def extract_pdf(pdf_path: Path, out_dir: Path):
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument("pdf", type=Path)
+    parser.add_argument("pdf", nargs="+", help="PDF files, directories or glob patterns")
     parser.add_argument("--out", type=Path, default=Path("tables_out"))
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes (default 1 = serial, 0 = one per CPU)")
+    parser.add_argument("--format", dest="fmt", choices=sorted(SINKS), default="csv",
+                        help="per-table output format")
+    parser.add_argument("--document-format", choices=["parquet", "arrow"],
+                        help="also write all tables of each PDF to one <stem>_tables file")
+    parser.add_argument("--timings", action="store_true", help="print per-stage timing counters")
+    parser.add_argument("--trace", type=Path, help="write per-page / per-stage trace to this file")
+    parser.add_argument("--trace-format", choices=["json", "chrome"], default="json",
+                        help="json: stage totals + page records; chrome: chrome://tracing events")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the extraction cache")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--cache-size-mb", type=int, default=512)
     args = parser.parse_args()
 
-    extract_pdf(args.pdf, args.out)
+    timings = Tracer() if args.trace else StageTimings() if args.timings else None
+    cache = None if args.no_cache else ExtractionCache(args.cache_dir, args.cache_size_mb * 1024 ** 2)
+    try:
+        failures = extract_pdfs(expand_pdf_inputs(args.pdf), args.out, workers=args.workers or None,
+                                timings=timings, cache=cache, fmt=args.fmt, document_fmt=args.document_format)
+    finally:
+        # Also on failure: the trace is how a slow or broken document is found.
+        if args.trace:
+            timings.save(args.trace, args.trace_format)
+    if args.timings:
+        print(timings.report())
+    if failures:
+        print(f"Extraction complete; {len(failures)} PDF(s) failed:")
+        for path, error in failures.items():
+            print(f"  {path}: {error}")
+        sys.exit(1)
     print("Extraction complete.")
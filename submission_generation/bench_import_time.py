@@ -0,0 +1,78 @@
+"""
+Import-time budget for the generation entry points.
+
+    python bench_import_time.py [--repeat 5] [--budget-ms 400]
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter per
+repeat and reports the median cumulative import time of each target, its
+heaviest direct imports, and whether any of the deferred heavy dependencies
+(pandas, openpyxl, ReportLab, the OpenAI SDK) got imported anyway. Exits
+non-zero when a target is over budget or pulls in a deferred dependency.
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# module -> directory it is imported from
+TARGETS = {
+    "generation_agents_workflow": os.path.join(HERE, "src"),
+    "main": HERE,
+}
+
+DEFERRED = ("pandas", "openpyxl", "reportlab", "openai")
+
+
+def import_times(module, cwd):
+    """[(self_us, cumulative_us, depth, name)] from one -X importtime run."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def bench_target(module, cwd, repeat):
+    runs = [import_times(module, cwd) for _ in range(repeat)]
+    total_ms = statistics.median(next(r[1] for r in rows if r[3] == module) for rows in runs) / 1000
+    last = runs[-1]
+    # Direct children of the target module are one level deeper than it.
+    base_depth = next(r[2] for r in last if r[3] == module)
+    children = sorted((r for r in last if r[2] == base_depth + 1), key=lambda r: r[1], reverse=True)
+    leaked = sorted({r[3].split(".")[0] for r in last} & set(DEFERRED))
+    return total_ms, children[:8], leaked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    args = parser.parse_args()
+
+    failed = False
+    for module, cwd in TARGETS.items():
+        total_ms, children, leaked = bench_target(module, cwd, args.repeat)
+        over = total_ms > args.budget_ms
+        status = "OVER BUDGET" if over else "ok"
+        print(f"{module}: {total_ms:.0f} ms median of {args.repeat} (budget {args.budget_ms:.0f} ms) {status}")
+        for _, cumulative_us, _, name in children:
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+        if leaked:
+            print(f"    deferred dependencies imported eagerly: {', '.join(leaked)}")
+        failed |= over or bool(leaked)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
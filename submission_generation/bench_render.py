@@ -0,0 +1,153 @@
+"""
+Rendering benchmarks for the submission artifacts, on fake packages.
+
+    python bench_render.py excel [n_locations ...]
+    python bench_render.py pdf [n_docs]
+    python bench_render.py pdf_edit [n_claims]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+import generation_agents_workflow as workflow
+import pdf_styles
+from llm_backends import fake_submission_data
+
+
+def fake_package(seed=0, n_locations=3, n_claims=5):
+    data = fake_submission_data(seed, n_locations=(n_locations, n_locations), n_claims=(n_claims, n_claims))
+    return workflow.SubmissionPackage.model_validate(data)
+
+
+def measure(fn, *args):
+    """(seconds, peak traced MB); timed and traced in separate calls, as tracing slows allocation."""
+    t0 = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 ** 2
+
+
+# ------------------------------------------------------------------
+# Excel: write-only openpyxl vs the previous pandas path
+# ------------------------------------------------------------------
+def _generate_excel_pandas(data, filename):
+    # The pre-streaming implementation, kept as the reference.
+    import pandas as pd
+    rows = []
+    for loc in data.locations:
+        si = loc.sums_insured
+        items = [("Buildings", si.buildings), ("Machinery", si.machinery), ("Stock", si.stock), ("BI", si.bi)]
+        for cat, amt in items:
+            rows.append({"Location": loc.name, "Address": loc.address, "Category": cat, "Sum Insured": amt})
+    df = pd.DataFrame(rows)
+    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False)
+
+
+def bench_excel(*sizes):
+    import openpyxl
+    sizes = [int(n) for n in sizes] or [10, 1_000, 10_000]
+    # Both paths spend most of their time in openpyxl's per-cell XML writer,
+    # which runs about 1.5x faster on lxml (the fast-excel extra). The stream
+    # path also writes a subtotal row per location that the pandas reference
+    # doesn't.
+    print(f"openpyxl XML writer: {'lxml' if openpyxl.LXML else 'et_xmlfile (lxml not installed)'}")
+    print(f"{'locations':>10}{'pandas s':>11}{'pandas MB':>11}{'stream s':>11}{'stream MB':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            data = fake_package(n_locations=n)
+            # Warm imports so they aren't charged to the first size.
+            _generate_excel_pandas(fake_package(n_locations=1), os.path.join(tmp, "warm.xlsx"))
+            t_pd, mb_pd = measure(_generate_excel_pandas, data, os.path.join(tmp, "pandas.xlsx"))
+            t_ws, mb_ws = measure(workflow.generate_excel, data, os.path.join(tmp, "stream.xlsx"))
+            print(f"{n:>10}{t_pd:>11.2f}{mb_pd:>11.1f}{t_ws:>11.2f}{mb_ws:>11.1f}")
+
+
+# ------------------------------------------------------------------
+# PDF batch: shared styles vs rebuilding them for every document
+# ------------------------------------------------------------------
+def _render_batch(packages, out_dir, rebuild_styles):
+    for i, data in enumerate(packages):
+        if rebuild_styles:
+            # What every call paid before the style registry.
+            pdf_styles.stylesheet.cache_clear()
+            pdf_styles.table_style.cache_clear()
+        workflow.generate_formatted_pdf(data, os.path.join(out_dir, f"{i}.pdf"))
+
+
+def bench_pdf(n_docs=1000):
+    import contextlib
+    import io
+    n_docs = int(n_docs)
+    packages = [fake_package(seed) for seed in range(n_docs)]
+    builds = [0]
+    sample_sheet = pdf_styles.getSampleStyleSheet
+
+    def counted_sample_sheet():
+        builds[0] += 1
+        return sample_sheet()
+    pdf_styles.getSampleStyleSheet = counted_sample_sheet
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        _render_batch(packages[:1], tmp, False)  # warm imports and fonts
+        timings = {}
+        for label, rebuild in (("rebuilt per doc", True), ("shared registry", False)):
+            pdf_styles.stylesheet.cache_clear()
+            pdf_styles.table_style.cache_clear()
+            builds[0] = 0
+            t0 = time.perf_counter()
+            _render_batch(packages, tmp, rebuild)
+            timings[label] = (time.perf_counter() - t0, builds[0])
+    for label, (secs, builds) in timings.items():
+        print(f"{label:<16} {n_docs} docs  {secs:6.2f}s  {secs / n_docs * 1000:6.1f} ms/doc  "
+              f"stylesheet builds {builds}")
+
+
+# ------------------------------------------------------------------
+# PDF edit: full re-render vs cached sections after a one-claim edit
+# ------------------------------------------------------------------
+def bench_pdf_edit(n_claims=500):
+    import contextlib
+    import io
+    data = fake_package(n_locations=10, n_claims=int(n_claims))
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        cache = workflow.PdfSectionCache(os.path.join(tmp, "sections"))
+        out = os.path.join(tmp, "out.pdf")
+        workflow.generate_formatted_pdf(fake_package(), out)  # warm imports and fonts
+
+        def timed(label, fn, *args):
+            t0 = time.perf_counter()
+            status = fn(*args)
+            rendered = sum(v == "rendered" for v in status.values()) if status else None
+            rows.append((label, time.perf_counter() - t0, rendered))
+
+        timed("full render", workflow.generate_formatted_pdf, data, out)
+        timed("incremental, cold", workflow.generate_formatted_pdf_incremental, data, out, cache)
+        timed("incremental, unchanged", workflow.generate_formatted_pdf_incremental, data, out, cache)
+        data.claims_history[len(data.claims_history) // 2].status = "Reopened"
+        timed("full render, 1 edit", workflow.generate_formatted_pdf, data, out)
+        timed("incremental, 1 edit", workflow.generate_formatted_pdf_incremental, data, out, cache)
+    n_parts = len(workflow.pdf_section_parts(data))
+    for label, secs, rendered in rows:
+        parts = f"  {rendered}/{n_parts} sections rendered" if rendered is not None else ""
+        print(f"{label:<24} {secs * 1000:8.1f} ms{parts}")
+
+
+BENCHES = {
+    "excel": bench_excel,
+    "pdf": bench_pdf,
+    "pdf_edit": bench_pdf_edit,
+}
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "excel"
+    BENCHES[name](*sys.argv[2:])
@@ -1,5 +1,159 @@
+"""
+Batch generation of synthetic submission corpora.
+
+    python main.py --count 500 --seed-start 1000 --concurrency 8 --out corpus
+
+Seeds seed_start .. seed_start+count-1 are split into shards of --shard-size.
+Each shard directory holds one sub-directory of artifacts per seed and, once
+every package in it succeeded, a manifest.jsonl of
+{seed, shard, package, artifacts} records. A shard with a manifest is done:
+rerunning the same command after a crash skips it, and packages that finished
+inside an incomplete shard come back from the LLM cache. corpus/manifest.jsonl
+is the concatenation of the shard manifests, rebuilt at the end of each run.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+import generation_agents_workflow as workflow
+from llm_cache import open_cache
+
+
+def shard_seeds(seed_start, count, shard_size):
+    """[(shard_index, [seeds])] covering seed_start .. seed_start+count-1."""
+    seeds = range(seed_start, seed_start + count)
+    return [(k, list(seeds[i:i + shard_size])) for k, i in enumerate(range(0, count, shard_size))]
+
+
+def shard_dir(out_root, shard):
+    return os.path.join(out_root, f"shard_{shard:05d}")
+
+
+def check_corpus_config(out_root, config):
+    # Resuming with a different seed range or shard size would mix shards
+    # from two layouts, so the first run pins them.
+    path = os.path.join(out_root, "corpus.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            existing = json.load(f)
+        if existing != config:
+            raise SystemExit(f"{path} was written with {existing}; refusing to resume with {config}")
+    else:
+        os.makedirs(out_root, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(config, f, indent=2)
+
+
+async def generate_shard(aclient, template_content, out_root, shard, seeds, semaphore, **options):
+    """Generate every seed in the shard; write its manifest only if all succeeded."""
+    directory = shard_dir(out_root, shard)
+    out_dirs = [os.path.join(directory, f"seed_{seed:08d}") for seed in seeds]
+    results = await asyncio.gather(
+        *(workflow.generate_package(aclient, template_content, d, semaphore, seed=seed, **options)
+          for seed, d in zip(seeds, out_dirs)),
+        return_exceptions=True,
+    )
+    failures = [(seed, r) for seed, r in zip(seeds, results) if isinstance(r, BaseException)]
+    if failures:
+        return failures
+
+    tmp = os.path.join(directory, "manifest.jsonl.tmp")
+    with open(tmp, "w") as f:
+        for seed, d, package in zip(seeds, out_dirs, results):
+            artifacts = {name: os.path.relpath(os.path.join(d, t.filename), out_root)
+                         for name, t in workflow.RENDER_TARGETS.items()}
+            record = {"seed": seed, "shard": shard, "package": package.model_dump(), "artifacts": artifacts}
+            f.write(json.dumps(record) + "\n")
+    os.replace(tmp, os.path.join(directory, "manifest.jsonl"))
+    print(f"📦 shard {shard:05d} complete ({len(seeds)} packages)")
+    return []
+
+
+def write_corpus_manifest(out_root, shards):
+    """Concatenate completed shard manifests, in shard order. Returns the number of records."""
+    n = 0
+    tmp = os.path.join(out_root, "manifest.jsonl.tmp")
+    with open(tmp, "w") as out:
+        for shard, _ in shards:
+            path = os.path.join(shard_dir(out_root, shard), "manifest.jsonl")
+            if os.path.exists(path):
+                with open(path) as f:
+                    for line in f:
+                        out.write(line)
+                        n += 1
+    os.replace(tmp, os.path.join(out_root, "manifest.jsonl"))
+    return n
+
+
+async def generate_corpus(out_root, template_content, count, seed_start=0, shard_size=50,
+                          concurrency=8, aclient=None, **options):
+    """Generate the shards not yet complete under out_root. Returns [(seed, exception)] failures."""
+    shards = shard_seeds(seed_start, count, shard_size)
+    pending = [(k, seeds) for k, seeds in shards
+               if not os.path.exists(os.path.join(shard_dir(out_root, k), "manifest.jsonl"))]
+    print(f"🗂  {len(shards) - len(pending)}/{len(shards)} shards already complete; "
+          f"generating {sum(len(s) for _, s in pending)} packages")
+
+    if aclient is None:
+        aclient = workflow.async_client()
+    # One semaphore across shards keeps `concurrency` calls in flight
+    # without idling at each shard's tail.
+    semaphore = asyncio.BoundedSemaphore(concurrency)
+    per_shard = await asyncio.gather(
+        *(generate_shard(aclient, template_content, out_root, k, seeds, semaphore, **options)
+          for k, seeds in pending)
+    )
+    n = write_corpus_manifest(out_root, shards)
+    print(f"📝 {n} records in {os.path.join(out_root, 'manifest.jsonl')}")
+    return [failure for failures in per_shard for failure in failures]
+
+
 def main():
-    print("Hello from submission-generation!")
+    parser = argparse.ArgumentParser(description="Generate a sharded corpus of synthetic submissions.")
+    parser.add_argument("--count", type=int, required=True, help="Number of submissions")
+    parser.add_argument("--seed-start", type=int, default=0, help="First seed; seeds are consecutive")
+    parser.add_argument("--shard-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM calls in flight")
+    parser.add_argument("--out", default="corpus", help="Corpus root directory")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds per LLM call attempt")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--render-executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint, e.g. a local stub server")
+    parser.add_argument("--backend", choices=["openai", "fake"], default="openai",
+                        help="fake = deterministic offline stand-in, for load-testing without network")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="Simulated seconds per fake LLM call")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the model, bypassing the response cache")
+    args = parser.parse_args()
+
+    check_corpus_config(args.out, {
+        "seed_start": args.seed_start, "count": args.count,
+        "shard_size": args.shard_size, "model": workflow.MODEL,
+    })
+    workflow.use_backend(args.backend, base_url=args.base_url,
+                         latency=args.fake_latency, jitter=args.fake_latency / 5)
+    # Fake replies must never land in the cache real runs read from.
+    workflow.llm_cache = open_cache(not args.no_cache and args.backend != "fake")
+    template_content = workflow.load_template()
+
+    t0 = time.perf_counter()
+    failures = asyncio.run(generate_corpus(
+        args.out, template_content, args.count, seed_start=args.seed_start,
+        shard_size=args.shard_size, concurrency=args.concurrency,
+        timeout=args.timeout, retries=args.retries, render_executor=args.render_executor,
+    ))
+    elapsed = time.perf_counter() - t0
+    for seed, err in failures:
+        print(f"❌ seed {seed}: {type(err).__name__}: {err}")
+    print(f"   {elapsed:.1f}s; LLM cache: {workflow.llm_cache.stats()}")
+    if failures:
+        print(f"\n{len(failures)} packages failed; rerun the same command to resume.")
+        raise SystemExit(1)
+    print("\n✅ Corpus complete.")
 
 
 if __name__ == "__main__":
@@ -3,12 +3,16 @@ from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.lib.units import inch, mm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import Paragraph, Table, TableStyle, Frame, Spacer
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
+from reportlab.platypus import Paragraph, Frame, Spacer
 import io
+import os
+import sys
 import random
 
+# Shared PDF styles live with the agent workflow in src/.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"))
+from pdf_styles import stylesheet, make_table
+
 # ==========================================
 # 1. GENERATE EXCEL (SUMS INSURED)
 # ==========================================
@@ -43,17 +47,18 @@ data = {
     ]
 }
 
-df = pd.DataFrame(data)
+def create_excel(filename):
+    df = pd.DataFrame(data)
 
-# Create Excel file
-with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-    df.to_excel(writer, index=False, sheet_name='Sums Insured Schedule')
-    
-    # Auto-adjust column widths (basic estimation)
-    worksheet = writer.sheets['Sums Insured Schedule']
-    for idx, col in enumerate(df.columns):
-        max_len = max(df[col].astype(str).map(len).max(), len(col)) + 2
-        worksheet.column_dimensions[chr(65 + idx)].width = max_len
+    # Create Excel file
+    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='Sums Insured Schedule')
+
+        # Auto-adjust column widths (basic estimation)
+        worksheet = writer.sheets['Sums Insured Schedule']
+        for idx, col in enumerate(df.columns):
+            max_len = max(df[col].astype(str).map(len).max(), len(col)) + 2
+            worksheet.column_dimensions[chr(65 + idx)].width = max_len
 
 # ==========================================
 # 2. GENERATE PDF (BROKING SUBMISSION)
@@ -64,13 +69,8 @@ pdf_filename = "Broking_Submission_Apex_Precision.pdf"
 def create_scanned_pdf(filename):
     c = canvas.Canvas(filename, pagesize=A4)
     width, height = A4
-    styles = getSampleStyleSheet()
-    
-    # Custom Styles
-    styles.add(ParagraphStyle(name='MainTitle', parent=styles['Heading1'], fontSize=24, alignment=TA_CENTER, spaceAfter=20, fontName='Helvetica-Bold'))
-    styles.add(ParagraphStyle(name='SectionHeader', parent=styles['Heading2'], fontSize=16, spaceBefore=15, spaceAfter=10, fontName='Helvetica-Bold', textColor=colors.darkblue))
-    styles.add(ParagraphStyle(name='NormalText', parent=styles['Normal'], fontSize=10, spaceAfter=6, fontName='Helvetica', leading=14))
-    styles.add(ParagraphStyle(name='BulletItem', parent=styles['Normal'], fontSize=10, leftIndent=20, spaceAfter=4, bulletIndent=10))
+    # Custom Styles (MainTitle, SectionHeader, NormalText, BulletItem; see pdf_styles)
+    styles = stylesheet("scanned")
 
     def draw_background(c):
         # Simulate "Off-white" paper
@@ -210,16 +210,7 @@ def create_scanned_pdf(filename):
         ["2020", "Nil", "-", "-", "-"]
     ]
     
-    t = Table(loss_data, colWidths=[40, 60, 60, 60, 250])
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0,0), (-1,0), 12),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-    ]))
-    story.append(t)
+    story.append(make_table("scanned", "claims", loss_data))
 
     f = Frame(0.8*inch, 0.8*inch, width - 1.6*inch, height - 1.6*inch, showBoundary=0)
     f.addFromList(story, c)
@@ -245,13 +236,7 @@ def create_scanned_pdf(filename):
         ["Drivers", "3", "£90,000"],
         ["<b>TOTAL</b>", "<b>84</b>", "<b>£3,290,000</b>"]
     ]
-    t_wage = Table(wage_data, colWidths=[250, 80, 100])
-    t_wage.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-    ]))
-    story.append(t_wage)
+    story.append(make_table("scanned", "wageroll", wage_data))
     
     story.append(Spacer(1, 15))
     story.append(Paragraph("<b>Public & Products Liability (£5m Limit)</b>", styles['Heading3']))
@@ -268,13 +253,7 @@ def create_scanned_pdf(filename):
         ["Rest of World", "£0"],
         ["<b>TOTAL</b>", "<b>£14,500,000</b>"]
     ]
-    t_to = Table(turnover_data, colWidths=[250, 100])
-    t_to.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-    ]))
-    story.append(t_to)
+    story.append(make_table("scanned", "turnover", turnover_data))
     
     story.append(Spacer(1, 10))
     story.append(Paragraph("Note regarding USA Exports: Indirect exports only (via UK Tier 1 suppliers). No direct sales offices or assets in North America.", styles['NormalText']))
@@ -295,4 +274,7 @@ def create_scanned_pdf(filename):
 
 
 if __name__ == "__main__":
+    # Only when run as a script: importing the module (e.g. from a benchmark
+    # in another directory) must not drop the Excel file there.
+    create_excel(excel_filename)
     create_scanned_pdf(pdf_filename)
@@ -1,40 +1,49 @@
 import json
 import pandas as pd
 import os
+import sys
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
-from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import Paragraph, Table, TableStyle, Frame, Spacer
-from reportlab.lib.enums import TA_CENTER
+from reportlab.platypus import Paragraph, Frame, Spacer
+
+# Shared response cache and PDF styles live with the agent workflow in src/.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"))
+from llm_cache import open_cache
+from pdf_styles import stylesheet, make_table
 
 
 # ==========================================
 # 1. THE LLM GENERATION LAYER
 # ==========================================
 
-def get_data_from_llm(template_text):
+def get_data_from_llm(template_text, cache=None):
     """
     In a real scenario, this function sends the 'template_text' to 
     GPT-4 or Gemini with a system prompt asking for JSON output.
+    Responses go through the shared LLM cache (pass cache=NoCache() to bypass).
     """
     
     # --- REAL API CODE (COMMENTED OUT) ---
     from openai import OpenAI
 
-    openai = OpenAI()
+    cache = cache if cache is not None else open_cache()
 
     prompt = f"Read this template: {template_text}. Generate a realistic insurance submission for a UK manufacturer. OUTPUT AS VALID JSON."
-    response = openai.chat.completions.create(model="gpt-5.2", messages=[{"role": "user", "content": prompt}])
-    
-    # print(response.choices[0].message.content)  # For debugging
-    # Replace and assign back to original content
-    json_result = response.choices[0].message.content
-    json_result = json_result.replace("```json", "")
-    json_result = json_result.replace("```", "")
 
-    return json.loads(json_result)
+    def call(request):
+        openai = OpenAI()
+        response = openai.chat.completions.create(**request)
+        # print(response.choices[0].message.content)  # For debugging
+        # Replace and assign back to original content
+        json_result = response.choices[0].message.content
+        json_result = json_result.replace("```json", "")
+        json_result = json_result.replace("```", "")
+        # Parse before caching so a malformed reply is never stored
+        return json.loads(json_result)
+
+    return cache.cached(dict(model="gpt-5.2", messages=[{"role": "user", "content": prompt}]), call,
+                        encode=json.dumps, decode=json.loads)
     # -------------------------------------
 
     print("🔄 Step 2: Calling (Simulated) LLM to generate synthetic data...")
@@ -135,12 +144,10 @@ def generate_pdf(data, filename="Output_Submission.pdf"):
     
     c = canvas.Canvas(filename, pagesize=A4)
     width, height = A4
-    styles = getSampleStyleSheet()
     
-    # Custom Styles
-    title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=24, alignment=TA_CENTER)
-    h2_style = ParagraphStyle('H2', parent=styles['Heading2'], spaceBefore=15, textColor=colors.darkblue)
-    normal_style = ParagraphStyle('Normal', parent=styles['Normal'], spaceAfter=6)
+    # Custom Styles (shared across calls, see pdf_styles)
+    styles = stylesheet("pipeline")
+    title_style, h2_style, normal_style = styles['Title'], styles['H2'], styles['Body']
 
     story = []
 
@@ -175,24 +182,13 @@ def generate_pdf(data, filename="Output_Submission.pdf"):
     # Wageroll Table
     story.append(Paragraph("<b>Wageroll Split</b>", styles['Normal']))
     wage_data = [["Category", "Amount"]] + data['liability']['wageroll']
-    t = Table(wage_data, colWidths=[200, 100])
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-    ]))
-    story.append(t)
+    story.append(make_table("pipeline", "wageroll", wage_data))
 
     # -- Claims --
     story.append(Paragraph("Claims History", h2_style))
     claims_data = [["Year", "Type", "Amount", "Details"]] + data['claims']
-    t2 = Table(claims_data, colWidths=[50, 80, 60, 200])
-    t2.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('FONTSIZE', (0,0), (-1,-1), 8),
-    ]))
     story.append(Spacer(1, 10))
-    story.append(t2)
+    story.append(make_table("pipeline", "claims", claims_data))
 
     # Build PDF
     f = Frame(inch, inch, width - 2*inch, height - 2*inch)
@@ -231,7 +227,9 @@ if __name__ == "__main__":
         md_content = f.read()
 
     # B. Call the (simulated) LLM to get structured JSON
-    submission_data = get_data_from_llm(md_content)
+    cache = open_cache()
+    submission_data = get_data_from_llm(md_content, cache)
+    print(f"   LLM cache: {cache.stats()}")
 
     # Save the JSON for reference
     with open("Output_Submission.json", "w") as f:
@@ -1,27 +1,60 @@
+import io
 import os
+import sys
 import json
-import pandas as pd
+import hashlib
+import time
+import random
+import asyncio
+import argparse
 from typing import List
-from pydantic import BaseModel, Field
-from openai import OpenAI
+from functools import lru_cache
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pydantic import BaseModel, Field, TypeAdapter
+from llm_backends import make_clients
+from llm_cache import NoCache, open_cache, request_key
 
-# ReportLab Imports (Updated for Multi-page support)
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer, ListFlowable, ListItem, PageBreak
-from reportlab.lib.enums import TA_CENTER
+# openpyxl, ReportLab and the OpenAI SDK are imported by the stage
+# that uses them, so importing this module stays cheap (bench_import_time.py).
 
 # ==========================================
 # 0. CONFIGURATION
 # ==========================================
-client = OpenAI() # Ensure OPENAI_API_KEY is set
-TEMPLATE_FILE = "../../data/manufacturing_template.md"
+# Model backend (see llm_backends). The real OpenAI clients are created on
+# first use; use_backend("fake") swaps in the offline stand-in.
+client = None
+aclient = None
+TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "manufacturing_template.md")
+MODEL = "gpt-5.2-2025-12-11"
+# Response cache for both agents; __main__ opens the on-disk one unless --no-cache.
+llm_cache = NoCache()
 
-if not os.path.exists(TEMPLATE_FILE):
-    # Raise error if template missing
-    raise FileNotFoundError(f"Template file '{TEMPLATE_FILE}' not found. Please create it.")
+
+
+def load_template(path=TEMPLATE_FILE) -> str:
+    if not os.path.exists(path):
+        # Raise error if template missing
+        raise FileNotFoundError(f"Template file '{path}' not found. Please create it.")
+    with open(path, "r") as f:
+        return f.read()
+
+
+def use_backend(backend="openai", base_url=None, latency=0.0, jitter=0.0):
+    global client, aclient
+    client, aclient = make_clients(backend, base_url=base_url, latency=latency, jitter=jitter)
+
+
+def sync_client():
+    if client is None:
+        use_backend()  # Ensure OPENAI_API_KEY is set
+    return client
+
+
+def async_client():
+    if aclient is None:
+        use_backend()
+    return aclient
 
 # ==========================================
 # 1. PYDANTIC SCHEMA
@@ -73,9 +106,15 @@ class SubmissionPackage(BaseModel):
 # 2. THE AGENTS (FIXED)
 # ==========================================
 
-def agent_creative_writer(template_content: str) -> str:
+def agent_creative_writer(template_content: str, seed=None) -> str:
     print("✍️  Agent 1: Writing narrative AND email draft...")
-    
+    return llm_cache.cached(
+        creative_writer_request(template_content, seed),
+        lambda req: sync_client().chat.completions.create(**req).choices[0].message.content,
+    )
+
+
+def creative_writer_request(template_content: str, seed=None) -> dict:
     # FIX: Explicitly ask for the email draft in the prompt
     system_prompt = (
         "You are a Senior Insurance Broker. "
@@ -84,19 +123,28 @@ def agent_creative_writer(template_content: str) -> str:
         "3. AT THE VERY END, write a short, professional email to an underwriter (Subject: New Submission) summarizing the risk."
     )
     
-    response = client.chat.completions.create(
-        model="gpt-5.2-2025-12-11",
+    request = dict(
+        model=MODEL,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f"Template:\n{template_content}"}
         ]
     )
-    return response.choices[0].message.content
+    if seed is not None:
+        request["seed"] = seed
+    return request
 
 
-def agent_data_extractor(narrative_text: str) -> SubmissionPackage:
+def agent_data_extractor(narrative_text: str, seed=None) -> SubmissionPackage:
     print("🤖 Agent 2: Extracting data and email text...")
-    
+    return llm_cache.cached(
+        data_extractor_request(narrative_text, seed),
+        lambda req: sync_client().beta.chat.completions.parse(**req).choices[0].message.parsed,
+        encode=SubmissionPackage.model_dump_json, decode=SubmissionPackage.model_validate_json,
+    )
+
+
+def data_extractor_request(narrative_text: str, seed=None) -> dict:
     # FIX: Explicitly ask Agent 2 to extract the email section
     system_prompt = (
         "You are a Data Extractor. "
@@ -106,160 +154,327 @@ def agent_data_extractor(narrative_text: str) -> SubmissionPackage:
         "Ensure all numeric tables are captured perfectly."
     )
     
-    completion = client.beta.chat.completions.parse(
-        model="gpt-5.2-2025-12-11",
+    request = dict(
+        model=MODEL,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": narrative_text},
         ],
         response_format=SubmissionPackage,
     )
-    return completion.choices[0].message.parsed
+    if seed is not None:
+        request["seed"] = seed
+    return request
 
 
 # ==========================================
 # 3. PDF GENERATOR
 # ==========================================
-def generate_formatted_pdf(data: SubmissionPackage, filename="Submission_Formatted.pdf"):
-    print(f"📄 Generating Formatted PDF (Fixed Layout): {filename}")
-    
+def _formatted_doc(target):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate
     # FIX 1: Reduce margins from 1 inch to 0.5 inch to give the table more room
-    doc = SimpleDocTemplate(
-        filename,
+    return SimpleDocTemplate(
+        target,
         pagesize=A4,
         rightMargin=0.5*inch, leftMargin=0.5*inch,
         topMargin=0.5*inch, bottomMargin=0.5*inch
     )
+
+
+# (section, SubmissionPackage fields it reads), in document order
+PDF_SECTIONS = [
+    ("intro", ("client_name", "broker_name")),
+    ("risk_overview", ("business_description",)),
+    ("risk_management", ("risk_management_narrative", "risk_management_points")),
+    ("property", ("locations",)),
+    ("liability", ("wageroll_split", "turnover_split")),
+    ("claims", ("claims_history",)),
+]
+
+
+def section_story(section: str, data: SubmissionPackage, heading=True) -> list:
+    """Flowables for one PDF section; reads only that section's fields of data."""
+    # ReportLab Imports (Updated for Multi-page support)
+    from reportlab.platypus import Paragraph, Spacer, ListFlowable, ListItem
+    from pdf_styles import stylesheet, make_table
+
+    # Custom Styles (shared across calls, see pdf_styles)
+    styles = stylesheet("formatted")
+    style_title, style_h2, style_h3, style_body = styles['Title'], styles['H2'], styles['H3'], styles['Body']
     
-    styles = getSampleStyleSheet()
-    
-    # Custom Styles
-    style_title = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=22, spaceAfter=20, alignment=TA_CENTER, textColor=colors.darkslategrey)
-    style_h2 = ParagraphStyle('H2', parent=styles['Heading2'], fontSize=14, spaceBefore=15, textColor=colors.navy)
-    style_h3 = ParagraphStyle('H3', parent=styles['Heading3'], fontSize=11, spaceBefore=10)
-    style_body = ParagraphStyle('Body', parent=styles['Normal'], fontSize=10, leading=14, spaceAfter=8)
-    
-    # FIX 2: Create a specific style for Table formatting (smaller font, tight leading)
-    style_table_text = ParagraphStyle('TableText', parent=styles['Normal'], fontSize=9, leading=11)
+    # FIX 2: A specific style for Table formatting (smaller font, tight leading)
+    style_table_text = styles['TableText']
     
     story = []
 
-    # --- CONTENT ---
-
-    # 1. Header
-    story.append(Paragraph(f"BROKING SUBMISSION", style_title))
-    story.append(Paragraph(f"<b>Client:</b> {data.client_name}", style_body))
-    story.append(Paragraph(f"<b>Broker:</b> {data.broker_name}", style_body))
-    story.append(Spacer(1, 20))
+    if section == "intro":
+        # 1. Header
+        story.append(Paragraph(f"BROKING SUBMISSION", style_title))
+        story.append(Paragraph(f"<b>Client:</b> {data.client_name}", style_body))
+        story.append(Paragraph(f"<b>Broker:</b> {data.broker_name}", style_body))
+        story.append(Spacer(1, 20))
 
-    # 2. Risk Overview
-    story.append(Paragraph("Risk Overview", style_h2))
-    story.append(Paragraph(data.business_description, style_body))
+    elif section == "risk_overview":
+        # 2. Risk Overview
+        story.append(Paragraph("Risk Overview", style_h2))
+        story.append(Paragraph(data.business_description, style_body))
 
-    # 3. Risk Management
-    story.append(Paragraph("Risk Management", style_h2))
-    story.append(Paragraph(data.risk_management_narrative, style_body))
-    
-    if data.risk_management_points:
-        bullets = [ListItem(Paragraph(pt, style_body)) for pt in data.risk_management_points]
-        story.append(ListFlowable(bullets, bulletType='bullet', start='circle', leftIndent=20))
+    elif section == "risk_management":
+        # 3. Risk Management
+        story.append(Paragraph("Risk Management", style_h2))
+        story.append(Paragraph(data.risk_management_narrative, style_body))
+        
+        if data.risk_management_points:
+            bullets = [ListItem(Paragraph(pt, style_body)) for pt in data.risk_management_points]
+            story.append(ListFlowable(bullets, bulletType='bullet', start='circle', leftIndent=20))
 
-    # 4. Property
-    story.append(Paragraph("Property Summary", style_h2))
-    story.append(Paragraph("<i>(See attached Excel for full Sums Insured Schedule)</i>", style_body))
-    
-    for loc in data.locations:
-        story.append(Paragraph(f"<b>{loc.name}</b>: {loc.address}", style_h3))
-        story.append(Paragraph(loc.description, style_body))
-        story.append(Paragraph(f"<i>Security:</i> {loc.security_details}", style_body))
+    elif section == "property":
+        # 4. Property
+        story.append(Paragraph("Property Summary", style_h2))
+        story.append(Paragraph("<i>(See attached Excel for full Sums Insured Schedule)</i>", style_body))
+        
+        for loc in data.locations:
+            story.append(Paragraph(f"<b>{loc.name}</b>: {loc.address}", style_h3))
+            story.append(Paragraph(loc.description, style_body))
+            story.append(Paragraph(f"<i>Security:</i> {loc.security_details}", style_body))
 
-    # 5. Liability
-    story.append(Paragraph("Liability & Turnover", style_h2))
-    
-    # Wageroll Table
-    story.append(Paragraph("<b>Wageroll Split</b>", style_h3))
-    wage_data = [["Category", "Headcount", "Wageroll"]]
-    for w in data.wageroll_split:
-        wage_data.append([
-            Paragraph(w.category, style_table_text), # Wrap category text if long
-            str(w.count), 
-            f"£{w.amount:,.2f}"
-        ])
-    
-    # Adjusted widths for wider page
-    t_wage = Table(wage_data, colWidths=[300, 80, 120], hAlign='LEFT')
-    t_wage.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.aliceblue),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('PADDING', (0,0), (-1,-1), 5),
-    ]))
-    story.append(t_wage)
-    story.append(Spacer(1, 12))
-
-    # Turnover Table
-    story.append(Paragraph("<b>Turnover Split</b>", style_h3))
-    turnover_data = [["Territory", "Amount"]]
-    for t in data.turnover_split:
-        turnover_data.append([t.territory, f"£{t.amount:,.2f}"])
+    elif section == "liability":
+        # 5. Liability
+        story.append(Paragraph("Liability & Turnover", style_h2))
         
-    t_to = Table(turnover_data, colWidths=[300, 120], hAlign='LEFT')
-    t_to.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.aliceblue),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('PADDING', (0,0), (-1,-1), 5),
-    ]))
-    story.append(t_to)
-
-    # 6. Claims History (FIXED)
-    story.append(Paragraph("Claims History", style_h2))
-    claims_data = [["Year", "Type", "Status", "Amount", "Details"]]
-    
-    for c in data.claims_history:
-        # FIX 3: Wrap *every* text field in a Paragraph.
-        # This prevents overlap if "Type" or "Status" happens to be long.
-        c_year = Paragraph(c.year, style_table_text)
-        c_type = Paragraph(c.type, style_table_text)
-        c_status = Paragraph(c.status, style_table_text)
-        c_amt = Paragraph(c.amount, style_table_text)
-        c_details = Paragraph(c.details, style_table_text)
+        # Wageroll Table
+        story.append(Paragraph("<b>Wageroll Split</b>", style_h3))
+        wage_data = [["Category", "Headcount", "Wageroll"]]
+        for w in data.wageroll_split:
+            wage_data.append([
+                Paragraph(w.category, style_table_text), # Wrap category text if long
+                str(w.count), 
+                f"£{w.amount:,.2f}"
+            ])
         
-        claims_data.append([c_year, c_type, c_status, c_amt, c_details])
+        # Adjusted widths for wider page
+        story.append(make_table("formatted", "wageroll", wage_data))
+        story.append(Spacer(1, 12))
 
-    # FIX 4: Updated Column Widths (Total ~515pts, fits within 0.5" margins)
-    # Give 'Details' the most space (275)
-    t_claims = Table(claims_data, colWidths=[45, 75, 60, 60, 275], hAlign='LEFT')
-    
-    t_claims.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'), # Aligns text to top of cell
-        ('PADDING', (0,0), (-1,-1), 4),    # Adds breathing room inside cells
-    ]))
-    story.append(t_claims)
+        # Turnover Table
+        story.append(Paragraph("<b>Turnover Split</b>", style_h3))
+        turnover_data = [["Territory", "Amount"]]
+        for t in data.turnover_split:
+            turnover_data.append([t.territory, f"£{t.amount:,.2f}"])
+
+        story.append(make_table("formatted", "turnover", turnover_data))
+
+    elif section == "claims":
+        # 6. Claims History (FIXED); heading=False continues the table
+        if heading:
+            story.append(Paragraph("Claims History", style_h2))
+        claims_data = [["Year", "Type", "Status", "Amount", "Details"]]
+        
+        for c in data.claims_history:
+            # FIX 3: Wrap *every* text field in a Paragraph.
+            # This prevents overlap if "Type" or "Status" happens to be long.
+            c_year = Paragraph(c.year, style_table_text)
+            c_type = Paragraph(c.type, style_table_text)
+            c_status = Paragraph(c.status, style_table_text)
+            c_amt = Paragraph(c.amount, style_table_text)
+            c_details = Paragraph(c.details, style_table_text)
+            
+            claims_data.append([c_year, c_type, c_status, c_amt, c_details])
+
+        # FIX 4: Column widths come from the claims template (fits within 0.5" margins)
+        story.append(make_table("formatted", "claims", claims_data))
+
+    return story
+
+
+def generate_formatted_pdf(data: SubmissionPackage, filename="Submission_Formatted.pdf"):
+    print(f"📄 Generating Formatted PDF (Fixed Layout): {filename}")
+    story = [flowable for section, _ in PDF_SECTIONS for flowable in section_story(section, data)]
 
     # Build the PDF
-    doc.build(story)
+    _formatted_doc(filename).build(story)
+
+
+# ------------------------------------------
+# 3b. Incremental rendering by section
+# ------------------------------------------
+# Each section is laid out as its own small PDF, cached on disk under a hash
+# of its input fields, and the document is stitched together from those.
+# After an edit only the sections whose fields changed are typeset again.
+# Long claims tables are split into chunks so one edited claim re-lays out
+# CLAIMS_ROWS_PER_SECTION rows rather than the whole table. Sections start
+# on a fresh page, so pagination differs from generate_formatted_pdf.
+
+CLAIMS_ROWS_PER_SECTION = 20
+PDF_SECTION_VERSION = "1"
+DEFAULT_SECTION_CACHE_DIR = os.environ.get(
+    "PDF_SECTION_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "submission_generation", "pdf_sections")
+)
+
+
+def _import_pypdf():
+    try:
+        import pypdf
+    except ImportError as e:
+        raise ImportError("incremental PDF rendering requires pypdf "
+                          "(pip install 'submission-generation[incremental]' or pip install pypdf)") from e
+    return pypdf
+
+
+@lru_cache(maxsize=None)
+def _style_fingerprint() -> str:
+    # Editing a theme's styles or table templates invalidates cached sections.
+    import reportlab
+    import pdf_styles
+    return repr((PDF_SECTION_VERSION, reportlab.Version,
+                 pdf_styles.PARAGRAPH_STYLES["formatted"], pdf_styles.TABLE_TEMPLATES["formatted"]))
+
+
+def pdf_section_parts(data: SubmissionPackage):
+    """
+    [(name, section, inputs, heading)] in document order, where inputs holds
+    just that part's fields as plain JSON data.
+    """
+    parts = []
+    for section, fields in PDF_SECTIONS:
+        values = {f: field_adapter(f).dump_python(getattr(data, f), mode="json") for f in fields}
+        if section != "claims":
+            parts.append((section, section, values, True))
+            continue
+        claims = values["claims_history"]
+        for i in range(0, max(len(claims), 1), CLAIMS_ROWS_PER_SECTION):
+            chunk = {"claims_history": claims[i:i + CLAIMS_ROWS_PER_SECTION]}
+            parts.append((f"claims[{i}:{i + len(chunk['claims_history'])}]", section, chunk, i == 0))
+    return parts
+
+
+class PdfSectionCache:
+    """Rendered section PDFs on disk, one file per key, evicted oldest-first over max_bytes."""
+
+    def __init__(self, path=DEFAULT_SECTION_CACHE_DIR, max_bytes=256 * 1024 ** 2):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(section, inputs, heading):
+        blob = json.dumps([_style_fingerprint(), section, heading, inputs], sort_keys=True)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        path = os.path.join(self.path, key + ".pdf")
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # recency for eviction
+        return pdf
+
+    def put(self, key, pdf: bytes):
+        tmp = os.path.join(self.path, f"{key}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp, os.path.join(self.path, key + ".pdf"))
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".pdf"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+def generate_formatted_pdf_incremental(data: SubmissionPackage, filename="Submission_Formatted.pdf", cache=None):
+    """
+    Assemble the formatted PDF from cached sections, re-rendering only those
+    whose inputs changed. Returns {part name: "cached" | "rendered"}.
+    """
+    print(f"📄 Generating Formatted PDF (incremental): {filename}")
+    pypdf = _import_pypdf()
+    cache = cache if cache is not None else PdfSectionCache()
+    writer = pypdf.PdfWriter()
+    status = {}
+    for name, section, inputs, heading in pdf_section_parts(data):
+        key = cache.key(section, inputs, heading)
+        pdf = cache.get(key)
+        status[name] = "cached"
+        if pdf is None:
+            buf = io.BytesIO()
+            _formatted_doc(buf).build(section_story(section, partial_package(inputs), heading))
+            pdf = buf.getvalue()
+            cache.put(key, pdf)
+            status[name] = "rendered"
+        writer.append(io.BytesIO(pdf))
+    with open(filename, "wb") as f:
+        writer.write(f)
+    cache.evict()
+    return status
     
 # ==========================================
 # 4. EXCEL & EMAIL GENERATORS
 # ==========================================
+CURRENCY_FORMAT = '"£"#,##0.00'
+
+
 def generate_excel(data: SubmissionPackage, filename="Submission_SumsInsured.xlsx"):
     print(f"📊 Generating Excel: {filename}")
-    rows = []
+    # Write-only workbook: rows stream to disk as they are appended, so memory
+    # stays flat however many locations the package has.
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sums Insured")
+    for col, width in zip("ABCD", (30, 45, 18, 18)):
+        ws.column_dimensions[col].width = width
+    ws.freeze_panes = "A2"
+    bold = Font(bold=True)
+
+    def cell(value=None, font=None, money=False):
+        c = WriteOnlyCell(ws, value=value)
+        if font:
+            c.font = font
+        if money:
+            c.number_format = CURRENCY_FORMAT
+        return c
+
+    # Styled cells are built once per column and refilled: append() writes
+    # the row out before returning, and building (and style-registering) a
+    # fresh cell per row cost more than the row's XML. Plain values go in
+    # as-is.
+    amount = cell(money=True)
+    label, subtotal = cell(font=bold), cell(font=bold, money=True)
+
+    def total_row(text, formula):
+        label.value, subtotal.value = text, formula
+        ws.append([label, None, None, subtotal])
+
+    ws.append([cell(h, bold) for h in ("Location", "Address", "Category", "Sum Insured")])
+    row = 2
     for loc in data.locations:
         si = loc.sums_insured
-        items = [("Buildings", si.buildings), ("Machinery", si.machinery), ("Stock", si.stock), ("BI", si.bi)]
-        for cat, amt in items:
-            rows.append({"Location": loc.name, "Address": loc.address, "Category": cat, "Sum Insured": amt})
-    
-    df = pd.DataFrame(rows)
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
+        first = row
+        for cat, amt in (("Buildings", si.buildings), ("Machinery", si.machinery), ("Stock", si.stock), ("BI", si.bi)):
+            amount.value = amt
+            ws.append([loc.name, loc.address, cat, amount])
+            row += 1
+        # SUBTOTAL(9, ...) sums while skipping other SUBTOTALs, so the grand
+        # total below doesn't double count these.
+        total_row(f"{loc.name} subtotal", f"=SUBTOTAL(9,D{first}:D{row - 1})")
+        row += 1
+    # With no locations there is no range to sum (D2:D2 would be the total itself).
+    total_row("Total", f"=SUBTOTAL(9,D2:D{row - 1})" if data.locations else 0)
+    wb.save(filename)
 
 def generate_email_file(data: SubmissionPackage, filename="Submission_Email.txt"):
     print(f"📧 Generating Email: {filename}")
@@ -268,18 +483,330 @@ def generate_email_file(data: SubmissionPackage, filename="Submission_Email.txt"
         f.write(data.email_body)
 
 # ==========================================
-# 5. MAIN EXECUTION
+# 5. RENDER STAGE
+# ==========================================
+# The artifacts are independent consumers of one SubmissionPackage, so they
+# render concurrently. `fields` lists what a target reads, which lets the
+# streaming mode start it before the whole package has arrived.
+RenderTarget = namedtuple("RenderTarget", "render filename fields")
+
+RENDER_TARGETS = {}
+
+
+def register_render_target(name, render, filename, fields=None):
+    """Add an output: render(data, path) writes out_dir/filename. fields default to all."""
+    RENDER_TARGETS[name] = RenderTarget(render, filename, tuple(fields or SubmissionPackage.model_fields))
+
+
+register_render_target("excel", generate_excel, "Submission_SumsInsured.xlsx", ["locations"])
+register_render_target("pdf", generate_formatted_pdf, "Submission_Formatted.pdf")
+register_render_target("email", generate_email_file, "Submission_Email.txt", ["email_body"])
+
+
+def render_target(target: RenderTarget, data: SubmissionPackage, out_dir: str) -> float:
+    t0 = time.perf_counter()
+    target.render(data, os.path.join(out_dir, target.filename))
+    return time.perf_counter() - t0
+
+
+def render_package(data: SubmissionPackage, out_dir=".", targets=None, executor="thread", workers=None):
+    """
+    Render the registered targets (or just `targets`) into out_dir at once.
+    Returns {name: seconds}. executor="process" gets ReportLab layout out from
+    under the GIL; render functions must then be picklable (module-level).
+    """
+    names = list(targets or RENDER_TARGETS)
+    os.makedirs(out_dir, exist_ok=True)
+    pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_cls(workers or len(names)) as pool:
+        futures = {name: pool.submit(render_target, RENDER_TARGETS[name], data, out_dir) for name in names}
+        return {name: f.result() for name, f in futures.items()}
+
+
+def format_render_timings(timings: dict) -> str:
+    return ", ".join(f"{name} {secs:.2f}s" for name, secs in timings.items())
+
+
+# ==========================================
+# 6. ASYNC BATCH RUNNER
+# ==========================================
+def retryable_errors():
+    """
+    Errors worth another attempt; anything else (bad request, auth, schema
+    validation) fails the package straight away. If the OpenAI SDK was never
+    imported (fake backend) none of its errors can occur, so don't import it.
+    """
+    openai = sys.modules.get("openai")
+    if openai is None:
+        return (asyncio.TimeoutError,)
+    return (
+        asyncio.TimeoutError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+
+async def call_with_retries(make_call, timeout=120.0, retries=3, backoff=1.0):
+    """
+    Await make_call() with a per-attempt timeout, retrying transient errors
+    with exponential backoff plus jitter (backoff, 2*backoff, 4*backoff...).
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await asyncio.wait_for(make_call(), timeout)
+        except retryable_errors() as e:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt * (1 + random.random() / 2)
+            print(f"   ↻ {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            await asyncio.sleep(delay)
+
+
+async def agent_creative_writer_async(aclient, template_content: str, seed=None, **retry) -> str:
+    async def call(req):
+        response = await call_with_retries(lambda: aclient.chat.completions.create(**req), **retry)
+        return response.choices[0].message.content
+    return await llm_cache.acached(creative_writer_request(template_content, seed), call)
+
+
+async def agent_data_extractor_async(aclient, narrative_text: str, seed=None, **retry) -> SubmissionPackage:
+    async def call(req):
+        completion = await call_with_retries(lambda: aclient.beta.chat.completions.parse(**req), **retry)
+        return completion.choices[0].message.parsed
+    return await llm_cache.acached(
+        data_extractor_request(narrative_text, seed), call,
+        encode=SubmissionPackage.model_dump_json, decode=SubmissionPackage.model_validate_json,
+    )
+
+
+def write_package(data: SubmissionPackage, out_dir: str, executor="thread"):
+    """Render every target for one package into out_dir, plus its structured JSON."""
+    timings = render_package(data, out_dir, executor=executor)
+    with open(os.path.join(out_dir, "submission.json"), "w") as f:
+        f.write(data.model_dump_json(indent=2))
+    print(f"   [{out_dir}] rendered {format_render_timings(timings)}")
+    return timings
+
+
+async def generate_package(aclient, template_content, out_dir, semaphore, seed=None,
+                           render_executor="thread", **retry):
+    # The semaphore bounds in-flight LLM calls; rendering runs in a worker
+    # thread afterwards so it doesn't hold a slot or block the event loop.
+    async with semaphore:
+        print(f"✍️  [{out_dir}] Writing narrative...")
+        narrative = await agent_creative_writer_async(aclient, template_content, seed, **retry)
+        print(f"🤖 [{out_dir}] Extracting data...")
+        data = await agent_data_extractor_async(aclient, narrative, seed, **retry)
+    await asyncio.to_thread(write_package, data, out_dir, render_executor)
+    return data
+
+
+async def run_batch(n, out_root, template_content, aclient=None, concurrency=4,
+                    timeout=120.0, retries=3, backoff=1.0, render_executor="thread"):
+    """
+    Generate n submission packages concurrently, each in out_root/submission_NNN.
+
+    aclient is anything shaped like AsyncOpenAI (chat.completions.create and
+    beta.chat.completions.parse) and defaults to the current backend's async
+    client. Returns a list of (out_dir, SubmissionPackage or the exception
+    that failed it).
+
+    Package i is requested with seed=i, so packages differ from each other
+    but a rerun is served from llm_cache.
+    """
+    if aclient is None:
+        aclient = async_client()
+    semaphore = asyncio.BoundedSemaphore(concurrency)
+    out_dirs = [os.path.join(out_root, f"submission_{i:03d}") for i in range(n)]
+    results = await asyncio.gather(
+        *(generate_package(aclient, template_content, d, semaphore, seed=i, render_executor=render_executor,
+                           timeout=timeout, retries=retries, backoff=backoff) for i, d in enumerate(out_dirs)),
+        return_exceptions=True,
+    )
+    return list(zip(out_dirs, results))
+
+
+# ==========================================
+# 7. SINGLE-CALL STREAMING MODE
+# ==========================================
+# One structured call writes the submission straight into SubmissionPackage,
+# instead of a free-text narrative that a second call re-reads to parse.
+# The response is streamed, and each artifact renders in a worker thread
+# as soon as the fields it reads are complete.
+
+def single_call_request(template_content: str, seed=None) -> dict:
+    system_prompt = (
+        "You are a Senior Insurance Broker. "
+        "Write a realistic submission for a UK Manufacturing client based on the template, "
+        "with synthetic but credible data, directly into the JSON schema. "
+        "Ensure all numeric tables are internally consistent. "
+        "In 'email_body', write a short, professional email to an underwriter (Subject: New Submission) summarizing the risk."
+    )
+    request = dict(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Template:\n{template_content}"}
+        ],
+        response_format=SubmissionPackage,
+    )
+    if seed is not None:
+        request["seed"] = seed
+    return request
+
+
+@lru_cache(maxsize=None)
+def field_adapter(name: str) -> TypeAdapter:
+    return TypeAdapter(SubmissionPackage.model_fields[name].annotation)
+
+
+def partial_package(fields: dict) -> SubmissionPackage:
+    """A SubmissionPackage holding only `fields`, each validated; renderers read just their own."""
+    return SubmissionPackage.model_construct(
+        **{name: field_adapter(name).validate_python(value) for name, value in fields.items()}
+    )
+
+
+def generate_single_call(template_content: str, out_dir=".", seed=None):
+    """
+    Stream one structured SubmissionPackage and render artifacts into out_dir
+    as their fields complete. Returns (package, timings); timings are seconds
+    from the start: first_token, <target>_ready, <target>_done, total, plus
+    each target's own <target>_render time.
+    """
+    print("⚡ Single call: streaming structured submission...")
+    os.makedirs(out_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    timings, pending, futures = {}, dict(RENDER_TARGETS), []
+
+    def render(name, target, data):
+        timings[f"{name}_render"] = render_target(target, data, out_dir)
+        timings[f"{name}_done"] = time.perf_counter() - t0
+
+    def submit_ready(completed):
+        for name, target in list(pending.items()):
+            if all(f in completed for f in target.fields):
+                del pending[name]
+                timings[f"{name}_ready"] = time.perf_counter() - t0
+                data = partial_package({f: completed[f] for f in target.fields})
+                futures.append(pool.submit(render, name, target, data))
+
+    request = single_call_request(template_content, seed)
+    key = request_key(request)
+    with ThreadPoolExecutor(len(RENDER_TARGETS)) as pool:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            package = SubmissionPackage.model_validate_json(cached)
+        else:
+            with sync_client().beta.chat.completions.stream(**request) as stream:
+                for event in stream:
+                    if event.type != "content.delta":
+                        continue
+                    timings.setdefault("first_token", time.perf_counter() - t0)
+                    # Every key but the last one has been closed by the model.
+                    if isinstance(event.parsed, dict) and len(event.parsed) > 1:
+                        submit_ready(dict(list(event.parsed.items())[:-1]))
+                package = stream.get_final_completion().choices[0].message.parsed
+            llm_cache.put(key, package.model_dump_json())
+        submit_ready(dict(package))
+    for future in futures:
+        future.result()
+    timings["total"] = time.perf_counter() - t0
+    return package, timings
+
+
+def generate_two_agent(template_content: str, out_dir=".", seed=None, executor="thread"):
+    """The original two-call path, timed the same way as generate_single_call."""
+    t0 = time.perf_counter()
+    timings = {}
+    narrative = agent_creative_writer(template_content, seed)
+    timings["first_token"] = timings["narrative_done"] = time.perf_counter() - t0
+    package = agent_data_extractor(narrative, seed)
+    ready = time.perf_counter() - t0
+    for name, secs in render_package(package, out_dir, executor=executor).items():
+        timings[f"{name}_ready"] = ready
+        timings[f"{name}_render"] = secs
+        # Targets run side by side; each is done `secs` after they all started.
+        timings[f"{name}_done"] = ready + secs
+    timings["total"] = time.perf_counter() - t0
+    return package, timings
+
+
+def print_latency_comparison(results: dict):
+    names = list(results)
+    keys = [k for k in ("first_token", "excel_done", "email_done", "pdf_done", "total")
+            if any(k in t for t in results.values())]
+    print(f"\n{'':<14}" + "".join(f"{n:>14}" for n in names))
+    for k in keys:
+        print(f"{k:<14}" + "".join(f"{results[n][k]:>13.1f}s" if k in results[n] else f"{'-':>14}" for n in names))
+
+
+# ==========================================
+# 8. MAIN EXECUTION
 # ==========================================
 if __name__ == "__main__":
-    with open(TEMPLATE_FILE, "r") as f: template_content = f.read()
+    parser = argparse.ArgumentParser(description="Generate synthetic broking submissions.")
+    parser.add_argument("--mode", choices=["two-agent", "single"], default="two-agent",
+                        help="single = one streamed structured call instead of writer + extractor")
+    parser.add_argument("--compare", action="store_true",
+                        help="Run both modes uncached into compare/ and print their latencies")
+    parser.add_argument("--count", type=int, default=None,
+                        help="Generate this many packages concurrently (default: one, in the current dir)")
+    parser.add_argument("--out", default="batch_output", help="Root directory for --count packages")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds per LLM call attempt")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint, e.g. a local stub server")
+    parser.add_argument("--backend", choices=["openai", "fake"], default="openai",
+                        help="fake = deterministic offline stand-in (no network, no API key)")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="Simulated seconds per fake LLM call")
+    parser.add_argument("--render-executor", choices=["thread", "process"], default="thread",
+                        help="Pool that renders the artifacts side by side (process avoids the GIL)")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the model, bypassing the response cache")
+    parser.add_argument("--cache-ttl-hours", type=float, default=7 * 24)
+    parser.add_argument("--cache-size-mb", type=int, default=256)
+    parser.add_argument("--incremental-pdf", action="store_true",
+                        help="Assemble the PDF from cached sections, re-rendering only edited ones (needs pypdf)")
+    args = parser.parse_args()
 
-    # Pipeline
-    raw_narrative = agent_creative_writer(template_content)
-    structured_data = agent_data_extractor(raw_narrative)
+    if args.incremental_pdf:
+        register_render_target("pdf", generate_formatted_pdf_incremental, "Submission_Formatted.pdf")
 
-    # File Creation
-    generate_excel(structured_data)
-    generate_formatted_pdf(structured_data)
-    generate_email_file(structured_data)
-    
-    print("\n✅ SUCCESS: All files generated. Email body is now populated.")
+    use_backend(args.backend, base_url=args.base_url, latency=args.fake_latency, jitter=args.fake_latency / 5)
+    # Fake replies must never land in the cache real runs read from.
+    llm_cache = open_cache(not args.no_cache and args.backend != "fake", ttl=args.cache_ttl_hours * 3600,
+                           max_bytes=args.cache_size_mb * 1024 ** 2)
+    template_content = load_template()
+
+    if args.compare:
+        llm_cache = NoCache()
+        latencies = {
+            "two-agent": generate_two_agent(template_content, os.path.join("compare", "two_agent"))[1],
+            "single": generate_single_call(template_content, os.path.join("compare", "single"))[1],
+        }
+        print_latency_comparison(latencies)
+    elif args.count is None:
+        # Pipeline + File Creation
+        if args.mode == "single":
+            structured_data, latency = generate_single_call(template_content)
+        else:
+            structured_data, latency = generate_two_agent(template_content, executor=args.render_executor)
+
+        print("\n✅ SUCCESS: All files generated. Email body is now populated.")
+        rendered = {name: latency[f"{name}_render"] for name in RENDER_TARGETS}
+        print(f"   Rendered {format_render_timings(rendered)}")
+        print(f"   Total {latency['total']:.1f}s; LLM cache: {llm_cache.stats()}")
+    else:
+        results = asyncio.run(run_batch(
+            args.count, args.out, template_content,
+            concurrency=args.concurrency, timeout=args.timeout, retries=args.retries,
+            render_executor=args.render_executor,
+        ))
+        failed = [(d, r) for d, r in results if isinstance(r, BaseException)]
+        for d, err in failed:
+            print(f"❌ {d}: {type(err).__name__}: {err}")
+        print(f"\n✅ {len(results) - len(failed)}/{len(results)} packages written under {args.out}")
+        print(f"   LLM cache: {llm_cache.stats()}")
+        raise SystemExit(1 if failed else 0)
@@ -0,0 +1,190 @@
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+# ==========================================
+# MODEL BACKENDS
+# ==========================================
+# A backend is anything shaped like the OpenAI client as the workflow uses it:
+#   chat.completions.create(**request)          -> .choices[0].message.content
+#   beta.chat.completions.parse(**request)      -> .choices[0].message.parsed
+#   beta.chat.completions.stream(**request)     -> context manager yielding
+#       "content.delta" events with a partial .parsed, plus get_final_completion()
+# and the async client exposes the same with awaitables. make_clients() picks
+# the real OpenAI clients or the deterministic offline fake below.
+
+BROKERS = ["Summit Risk Solutions", "Harbour & Vale Brokers", "Northgate Insurance Partners", "Meridian Risk"]
+CONTACTS = ["Sarah Jenkins", "Tom Okafor", "Priya Desai", "James Whitlock", "Elena Rossi"]
+CLIENT_STEMS = ["Apex", "Sterling", "Brightwell", "Castlegate", "Ironbridge", "Kestrel", "Norcross"]
+CLIENT_TRADES = ["Precision Engineering", "Plastics", "Fabrications", "Components", "Polymers", "Castings"]
+TOWNS = [("Birmingham", "B24 9QZ"), ("Coventry", "CV6 4BX"), ("Leeds", "LS10 1PL"),
+         ("Sheffield", "S9 2RR"), ("Derby", "DE24 8UP"), ("Bolton", "BL3 6AJ")]
+WAGE_CATEGORIES = ["Clerical", "Manual (Premises)", "Manual (Away)", "Drivers", "Directors"]
+TERRITORIES = ["UK", "Europe", "USA/Canada", "Rest of World"]
+CLAIM_TYPES = ["Escape of Water", "Storm", "Theft", "Fire", "Employers Liability", "Public Liability"]
+CLAIM_STATUSES = ["Closed", "Open", "Settled", "Reserved"]
+SEED_MARKER = "Fake reference: FAKE-{seed}"
+
+
+def fake_submission_data(seed: int, n_locations=(1, 4), n_claims=(1, 8)) -> dict:
+    """SubmissionPackage-shaped data that depends only on seed."""
+    rng = random.Random(seed)
+    client_name = f"{rng.choice(CLIENT_STEMS)} {rng.choice(CLIENT_TRADES)} Ltd"
+    broker, contact = rng.choice(BROKERS), rng.choice(CONTACTS)
+    locations = []
+    for i in range(rng.randint(*n_locations)):
+        town, postcode = rng.choice(TOWNS)
+        locations.append({
+            "name": f"{'Main Plant' if i == 0 else f'Site {i + 1}'} ({town})",
+            "address": f"Unit {rng.randint(1, 60)}, Industrial Estate, {town} {postcode}",
+            "description": f"Steel portal frame, built {rng.randint(1975, 2020)}, {rng.randint(8, 120) * 100} sqm.",
+            "security_details": rng.choice(["NSI Gold intruder alarm, CCTV", "Monitored alarm, palisade fencing",
+                                            "24h manned guarding, sprinklers"]),
+            "sums_insured": {
+                "buildings": float(rng.randint(5, 80) * 100_000),
+                "machinery": float(rng.randint(1, 30) * 100_000),
+                "stock": float(rng.randint(1, 20) * 100_000),
+                "bi": float(rng.randint(5, 50) * 100_000),
+            },
+        })
+    claims = [
+        {
+            "year": str(rng.randint(2019, 2025)),
+            "type": rng.choice(CLAIM_TYPES),
+            "status": rng.choice(CLAIM_STATUSES),
+            "amount": f"£{rng.randint(1, 250) * 100:,}",
+            "details": rng.choice(["Roof leak after storm, repaired.", "Forklift collision with racking.",
+                                   "Employee hand injury on press; RIDDOR reported.", "Break-in, tools stolen."]),
+        }
+        for _ in range(rng.randint(*n_claims))
+    ]
+    return {
+        "broker_name": broker,
+        "broker_contact": contact,
+        "client_name": client_name,
+        "business_description": f"{client_name} manufactures components for automotive and aerospace customers.",
+        "risk_management_narrative": "ISO 9001 accredited with a dedicated on-site risk manager.",
+        "risk_management_points": rng.sample(["ISO 9001, 14001, 45001 accredited", "Sprinklers (EN 12845)",
+                                              "Hot work permit system", "Annual thermographic survey",
+                                              "Lone worker procedures"], 3),
+        "locations": locations,
+        "wageroll_split": [{"category": c, "count": rng.randint(2, 120), "amount": float(rng.randint(1, 300) * 10_000)}
+                           for c in rng.sample(WAGE_CATEGORIES, 3)],
+        "turnover_split": [{"territory": t, "amount": float(rng.randint(1, 150) * 100_000)}
+                           for t in TERRITORIES[:rng.randint(1, len(TERRITORIES))]],
+        "claims_history": claims,
+        "email_body": f"Subject: New Submission - {client_name}\n\nPlease find attached our submission "
+                      f"for {client_name}.\n\nKind regards,\n{contact}\n{broker}",
+    }
+
+
+def _request_seed(request: dict) -> int:
+    # The extractor gets the writer's narrative back, so recover the seed
+    # from its marker; otherwise use the request's seed or a hash of it.
+    for message in request["messages"]:
+        match = re.search(r"FAKE-(\d+)", message["content"])
+        if match:
+            return int(match.group(1))
+    if request.get("seed") is not None:
+        return request["seed"]
+    blob = json.dumps(request["messages"], sort_keys=True).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(blob).digest()[:4], "big")
+
+
+def _narrative(data: dict, seed: int) -> str:
+    lines = [f"BROKING SUBMISSION - {data['client_name']}", SEED_MARKER.format(seed=seed), "",
+             data["business_description"], data["risk_management_narrative"]]
+    lines += [f"- {p}" for p in data["risk_management_points"]]
+    lines += [f"{loc['name']}: {loc['address']}. {loc['description']}" for loc in data["locations"]]
+    lines += [f"{c['year']} {c['type']} ({c['status']}) {c['amount']}: {c['details']}" for c in data["claims_history"]]
+    return "\n".join(lines + ["", data["email_body"]])
+
+
+def _completion(content=None, parsed=None):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content, parsed=parsed))])
+
+
+class FakeLLM:
+    """
+    Deterministic offline stand-in for OpenAI(). Output depends only on the
+    request seed (or the request itself); each call sleeps latency +/- jitter
+    seconds, spread across chunks when streaming.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, stream_chunks=20, n_locations=(1, 4), n_claims=(1, 8)):
+        self.latency, self.jitter, self.stream_chunks = latency, jitter, stream_chunks
+        self.sizes = dict(n_locations=n_locations, n_claims=n_claims)
+        self.calls = 0
+        completions = SimpleNamespace(create=self._create, parse=self._parse, stream=self._stream)
+        self.chat = SimpleNamespace(completions=completions)
+        self.beta = SimpleNamespace(chat=self.chat)
+
+    def _delay(self, request):
+        self.calls += 1
+        if not self.latency:
+            return 0.0
+        # Seeded so the simulated latency is reproducible too.
+        rng = random.Random(_request_seed(request) ^ self.calls)
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+
+    def _reply(self, request):
+        seed = _request_seed(request)
+        data = fake_submission_data(seed, **self.sizes)
+        if request.get("response_format") is None:
+            return _completion(content=_narrative(data, seed))
+        return _completion(parsed=request["response_format"].model_validate(data))
+
+    def _create(self, **request):
+        time.sleep(self._delay(request))
+        return self._reply(request)
+
+    _parse = _create
+
+    def _stream(self, **request):
+        return _FakeStream(self._reply(request), self._delay(request), self.stream_chunks)
+
+
+class _FakeStream:
+    def __init__(self, completion, delay, n_chunks):
+        self.completion, self.delay, self.n_chunks = completion, delay, n_chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        from jiter import from_json
+        text = self.completion.choices[0].message.parsed.model_dump_json()
+        step = max(1, len(text) // self.n_chunks)
+        for end in list(range(step, len(text), step)) + [len(text)]:
+            time.sleep(self.delay / self.n_chunks)
+            partial = from_json(text[:end].encode("utf-8"), partial_mode="trailing-strings")
+            yield SimpleNamespace(type="content.delta", delta=text[end - step:end], snapshot=text[:end], parsed=partial)
+
+    def get_final_completion(self):
+        return self.completion
+
+
+class AsyncFakeLLM(FakeLLM):
+    """FakeLLM for the async runner: awaitable create/parse, asyncio.sleep latency."""
+
+    async def _create(self, **request):
+        await asyncio.sleep(self._delay(request))
+        return self._reply(request)
+
+    _parse = _create
+
+
+def make_clients(backend="openai", base_url=None, latency=0.0, jitter=0.0):
+    """(sync client, async client) for the named backend: 'openai' or 'fake'."""
+    if backend == "fake":
+        return FakeLLM(latency, jitter), AsyncFakeLLM(latency, jitter)
+    from openai import OpenAI, AsyncOpenAI
+    # The async runner retries on its own, so the SDK's retries are off there.
+    return OpenAI(base_url=base_url), AsyncOpenAI(base_url=base_url, max_retries=0)
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+# ==========================================
+# LLM RESPONSE CACHE
+# ==========================================
+# Re-running the agents with an unchanged template, prompt and model (e.g.
+# while iterating on the PDF layout) should not re-pay the API calls. Entries
+# are keyed on a hash of the request and stored in SQLite with a TTL and a
+# total-size cap (least recently used entries go first).
+
+DEFAULT_CACHE_PATH = Path(os.environ.get(
+    "LLM_CACHE", Path.home() / ".cache" / "submission_generation" / "llm_cache.sqlite"
+))
+
+
+def _schema(response_format):
+    # Pydantic models are hashed by their JSON schema, so editing a field
+    # invalidates the cached structured outputs.
+    if hasattr(response_format, "model_json_schema"):
+        return response_format.model_json_schema()
+    return response_format
+
+
+def request_key(request: dict) -> str:
+    """Hash of a chat request: model, messages, response_format schema, seed and any other params."""
+    normalised = dict(request, response_format=_schema(request.get("response_format")))
+    blob = json.dumps(normalised, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed response cache.
+
+    get/put work on text; cached()/acached() wrap a call with an
+    encode/decode pair for non-text results. hits/misses/evictions count
+    since construction.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=7 * 24 * 3600, max_bytes=256 * 1024 ** 2):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, value: str):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        if self.ttl is not None:
+            cur = self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            self.evictions += cur.rowcount
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def cached(self, request: dict, call, encode=str, decode=str):
+        """Return decode(cached value) or call(request), storing encode(result)."""
+        key = request_key(request)
+        value = self.get(key)
+        if value is not None:
+            return decode(value)
+        result = call(request)
+        self.put(key, encode(result))
+        return result
+
+    async def acached(self, request: dict, call, encode=str, decode=str):
+        """cached() for an async call."""
+        key = request_key(request)
+        value = self.get(key)
+        if value is not None:
+            return decode(value)
+        result = await call(request)
+        self.put(key, encode(result))
+        return result
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": entries, "bytes": size}
+
+
+class NoCache:
+    """Drop-in for LLMCache that always calls through (e.g. --no-cache)."""
+
+    hits = misses = evictions = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        pass
+
+    def cached(self, request, call, encode=str, decode=str):
+        self.misses += 1
+        return call(request)
+
+    async def acached(self, request, call, encode=str, decode=str):
+        self.misses += 1
+        return await call(request)
+
+    def stats(self):
+        return {"hits": 0, "misses": self.misses, "evictions": 0, "entries": 0, "bytes": 0}
+
+
+def open_cache(enabled=True, path=DEFAULT_CACHE_PATH, ttl=7 * 24 * 3600, max_bytes=256 * 1024 ** 2):
+    return LLMCache(path, ttl=ttl, max_bytes=max_bytes) if enabled else NoCache()
@@ -0,0 +1,109 @@
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import Table, TableStyle
+
+# ==========================================
+# SHARED REPORTLAB STYLES & TABLE TEMPLATES
+# ==========================================
+# One theme per renderer:
+#   formatted - generation_agents_workflow.generate_formatted_pdf
+#   pipeline  - generation_pipeline.generate_pdf
+#   scanned   - doc_render.create_scanned_pdf
+# Styles and TableStyles are built once per process on first use and shared
+# by every document after that, instead of being rebuilt per call.
+
+# theme -> style name -> ParagraphStyle kwargs ("parent" names a sample style)
+PARAGRAPH_STYLES = {
+    "formatted": {
+        "Title": dict(parent="Heading1", fontSize=22, spaceAfter=20, alignment=TA_CENTER, textColor=colors.darkslategrey),
+        "H2": dict(parent="Heading2", fontSize=14, spaceBefore=15, textColor=colors.navy),
+        "H3": dict(parent="Heading3", fontSize=11, spaceBefore=10),
+        "Body": dict(parent="Normal", fontSize=10, leading=14, spaceAfter=8),
+        # Smaller font, tight leading for text wrapped inside table cells
+        "TableText": dict(parent="Normal", fontSize=9, leading=11),
+    },
+    "pipeline": {
+        "Title": dict(parent="Heading1", fontSize=24, alignment=TA_CENTER),
+        "H2": dict(parent="Heading2", spaceBefore=15, textColor=colors.darkblue),
+        "Body": dict(parent="Normal", spaceAfter=6),
+    },
+    "scanned": {
+        "MainTitle": dict(parent="Heading1", fontSize=24, alignment=TA_CENTER, spaceAfter=20, fontName="Helvetica-Bold"),
+        "SectionHeader": dict(parent="Heading2", fontSize=16, spaceBefore=15, spaceAfter=10,
+                              fontName="Helvetica-Bold", textColor=colors.darkblue),
+        "NormalText": dict(parent="Normal", fontSize=10, spaceAfter=6, fontName="Helvetica", leading=14),
+        "BulletItem": dict(parent="Normal", fontSize=10, leftIndent=20, spaceAfter=4, bulletIndent=10),
+    },
+}
+
+_GRID = ("GRID", (0, 0), (-1, -1), 0.5, colors.grey)
+_BOLD_HEADER = ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold")
+
+
+def _header(color):
+    return ("BACKGROUND", (0, 0), (-1, 0), color)
+
+
+_WRAPPED = [_header(colors.aliceblue), _GRID, _BOLD_HEADER, ("VALIGN", (0, 0), (-1, -1), "TOP"), ("PADDING", (0, 0), (-1, -1), 5)]
+
+# theme -> table kind -> Table kwargs plus "style", the TableStyle commands
+TABLE_TEMPLATES = {
+    "formatted": {
+        "wageroll": dict(colWidths=[300, 80, 120], hAlign="LEFT", style=_WRAPPED),
+        "turnover": dict(colWidths=[300, 120], hAlign="LEFT", style=_WRAPPED),
+        # Total ~515pts, fits within 0.5" margins; 'Details' gets the most space
+        "claims": dict(colWidths=[45, 75, 60, 60, 275], hAlign="LEFT", style=[
+            _header(colors.lightgrey), _GRID, _BOLD_HEADER,
+            ("VALIGN", (0, 0), (-1, -1), "TOP"), ("PADDING", (0, 0), (-1, -1), 4),
+        ]),
+        "locations": dict(colWidths=[155, 90, 90, 90, 90], hAlign="LEFT", style=_WRAPPED + [
+            ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ]),
+    },
+    "pipeline": {
+        "wageroll": dict(colWidths=[200, 100], style=[_header(colors.lightgrey), _GRID]),
+        "claims": dict(colWidths=[50, 80, 60, 200], style=[
+            _header(colors.lightgrey), _GRID, ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ]),
+    },
+    "scanned": {
+        "wageroll": dict(colWidths=[250, 80, 100], style=[_header(colors.lightgrey), _GRID, _BOLD_HEADER]),
+        "turnover": dict(colWidths=[250, 100], style=[_header(colors.lightgrey), _GRID, _BOLD_HEADER]),
+        "claims": dict(colWidths=[40, 60, 60, 60, 250], style=[
+            _header(colors.lightgrey),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            _BOLD_HEADER,
+            ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+            _GRID,
+        ]),
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def stylesheet(theme: str) -> dict:
+    """Sample stylesheet styles plus the theme's own, by name. Shared; don't mutate."""
+    sample = getSampleStyleSheet()
+    styles = dict(sample.byName)
+    for name, spec in PARAGRAPH_STYLES[theme].items():
+        spec = dict(spec)
+        styles[name] = ParagraphStyle(name, parent=sample[spec.pop("parent")], **spec)
+    return styles
+
+
+@lru_cache(maxsize=None)
+def table_style(theme: str, kind: str) -> TableStyle:
+    return TableStyle(TABLE_TEMPLATES[theme][kind]["style"])
+
+
+def make_table(theme: str, kind: str, rows, **overrides) -> Table:
+    """A Table for rows (header first) laid out and styled by the theme's template."""
+    kwargs = {k: v for k, v in TABLE_TEMPLATES[theme][kind].items() if k != "style"}
+    kwargs.update(overrides)
+    table = Table(rows, **kwargs)
+    table.setStyle(table_style(theme, kind))
+    return table